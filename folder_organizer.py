@@ -9,7 +9,7 @@
 
 from datetime import datetime
 from pathlib import Path
-from typing import Literal
+from typing import Dict, Literal, Set, Tuple
 
 
 # Типы структур папок
@@ -41,6 +41,13 @@ class FolderOrganizer:
             )
         
         self.structure = structure
+
+        # Кэш относительных путей папок: (год, месяц, день) -> "2023/08".
+        # Снимки обычно идут сериями по дням, поэтому путь вычисляется редко.
+        self._cache: Dict[Tuple[int, int, int], str] = {}
+
+        # Папки, уже созданные (или найденные) за время работы
+        self._created: Set[Path] = set()
     
     def get_folder_path(self, base_dir: Path, date: datetime) -> Path:
         """
@@ -68,15 +75,24 @@ class FolderOrganizer:
         """
         if self.structure == 'none':
             return base_dir
-        elif self.structure == 'year':
-            return base_dir / date.strftime('%Y')
-        elif self.structure == 'year-month':
-            return base_dir / date.strftime('%Y') / date.strftime('%m')
-        elif self.structure == 'date':
-            return base_dir / date.strftime('%Y-%m-%d')
-        else:
-            # Не должно произойти из-за валидации в __init__
-            raise ValueError(f"Неизвестная структура: {self.structure}")
+
+        key = (date.year, date.month, date.day)
+        tail = self._cache.get(key)
+
+        if tail is None:
+            # Форматирование целых чисел вместо strftime: быстрее и не зависит от локали
+            if self.structure == 'year':
+                tail = f"{date.year:04d}"
+            elif self.structure == 'year-month':
+                tail = f"{date.year:04d}/{date.month:02d}"
+            elif self.structure == 'date':
+                tail = f"{date.year:04d}-{date.month:02d}-{date.day:02d}"
+            else:
+                # Не должно произойти из-за валидации в __init__
+                raise ValueError(f"Неизвестная структура: {self.structure}")
+            self._cache[key] = tail
+
+        return base_dir / tail
     
     def create_folder(self, folder_path: Path, dry_run: bool = False) -> bool:
         """
@@ -89,13 +105,21 @@ class FolderOrganizer:
         Returns:
             True если папка была создана, False если уже существовала
         """
-        if folder_path.exists():
+        # Папку уже создавали для предыдущего файла: ни stat, ни mkdir не нужны
+        if folder_path in self._created:
             return False
-        
-        if not dry_run:
-            folder_path.mkdir(parents=True, exist_ok=True)
-        
-        return True
+
+        if dry_run:
+            return not folder_path.exists()
+
+        try:
+            folder_path.mkdir(parents=True)
+            created = True
+        except FileExistsError:
+            created = False
+
+        self._created.add(folder_path)
+        return created
     
     def get_description(self) -> str:
         """
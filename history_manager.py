@@ -11,15 +11,68 @@ import json
 import os
 import sys
 import ctypes
+import errno
+import functools
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Set, Tuple, Any, Union
+
+# renameat2 (Linux): не перезаписывать существующий файл назначения
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+
+
+@functools.lru_cache(maxsize=1)
+def _get_renameat2():
+    """Найти функцию renameat2 в libc (glibc 2.28+); None если она недоступна."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return None
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    renameat2.restype = ctypes.c_int
+    return renameat2
+
+
+def rename_noreplace(src: Union[str, Path], dst: Union[str, Path]) -> None:
+    """
+    Переименовать файл, не затирая существующий файл назначения.
+
+    В Windows это поведение os.rename. В POSIX os.rename молча заменяет
+    файл назначения, поэтому в Linux используется атомарный
+    renameat2(RENAME_NOREPLACE); на других системах и файловых системах
+    без его поддержки остаётся os.rename.
+
+    Raises:
+        FileExistsError: если файл назначения уже существует
+        OSError: прочие ошибки переименования
+    """
+    renameat2 = _get_renameat2()
+    if renameat2 is not None:
+        if renameat2(AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dst), RENAME_NOREPLACE) == 0:
+            return
+        err = ctypes.get_errno()
+        # EINVAL/ENOSYS: флаг не поддерживается файловой системой или ядром
+        if err not in (errno.EINVAL, errno.ENOSYS):
+            raise OSError(err, os.strerror(err), str(src), None, str(dst))
+    os.rename(src, dst)
+
 
 class HistoryManager:
     """Управление журналом изменений и отмена операций."""
 
-    HISTORY_FILENAME = ".rename_history.json"
+    # Журнал операций: одна JSON-запись на строку, новые дописываются в конец
+    HISTORY_FILENAME = ".rename_history.jsonl"
+    # Файл истории прежних версий (один JSON-массив), читается для миграции
+    LEGACY_HISTORY_FILENAME = ".rename_history.json"
     MAX_HISTORY_SIZE = 10
+    # Размер журнала в байтах, после которого он переписывается в компактном виде
+    COMPACT_THRESHOLD = 1 << 20
+    # Тип записи журнала, которая отменяет последнюю операцию
+    UNDO_OPERATION = "undo"
 
     def __init__(self, base_dir: Path):
         """
@@ -30,47 +83,132 @@ class HistoryManager:
         """
         self.base_dir = Path(base_dir)
         self.history_file = self.base_dir / self.HISTORY_FILENAME
+        self.legacy_history_file = self.base_dir / self.LEGACY_HISTORY_FILENAME
+        self._migrate_legacy = False
         self.history: List[Dict[str, Any]] = self._load()
 
     def _load(self) -> List[Dict[str, Any]]:
-        """Загрузить историю из файла."""
-        if not self.history_file.exists():
-            return []
+        """Загрузить историю из журнала (новые операции первыми)."""
+        # Воспроизводим журнал с тем же ограничением размера, что и при записи
+        history: deque = deque(maxlen=self.MAX_HISTORY_SIZE)
 
         try:
             with open(self.history_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Недописанная строка (например, сбой во время записи)
+                        continue
+                    if not isinstance(entry, dict):
+                        continue
+                    if entry.get("operation") == self.UNDO_OPERATION:
+                        if history:
+                            history.pop()
+                    else:
+                        history.append(entry)
+        except FileNotFoundError:
+            return self._load_legacy()
+        except IOError as e:
+            print(f"[!] Ошибка чтения файла истории: {e}. Будет создан новый.")
+            return []
+
+        history.reverse()
+        return list(history)
+
+    def _load_legacy(self) -> List[Dict[str, Any]]:
+        """Загрузить историю из файла прежнего формата (JSON-массив)."""
+        if not self.legacy_history_file.exists():
+            return []
+
+        try:
+            with open(self.legacy_history_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                if isinstance(data, list):
-                    return data
-                return []
         except (json.JSONDecodeError, IOError) as e:
             print(f"[!] Ошибка чтения файла истории: {e}. Будет создан новый.")
             return []
 
+        if not isinstance(data, list):
+            return []
+
+        # При первой записи история будет перенесена в журнал
+        self._migrate_legacy = True
+        return data[:self.MAX_HISTORY_SIZE]
+
     def _save(self) -> None:
-        """Сохранить историю в файл."""
+        """Переписать журнал целиком (компактный вид: только текущая история)."""
+        # Сериализуем целиком заранее, чтобы записать файл одним вызовом
+        data = "".join(
+            json.dumps(entry, ensure_ascii=False) + "\n"
+            for entry in reversed(self.history)
+        ).encode('utf-8')
+
         try:
-            # Снять атрибут "скрытый" перед записью (Windows)
-            if os.name == 'nt' and self.history_file.exists():
-                try:
-                    ctypes.windll.kernel32.SetFileAttributesW(str(self.history_file), 0)
-                except Exception:
-                    pass
-
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.history, f, indent=2, ensure_ascii=False)
-            
-            # Установить атрибут "скрытый" после записи (Windows)
-            if os.name == 'nt':
-                try:
-                    FILE_ATTRIBUTE_HIDDEN = 0x02
-                    ctypes.windll.kernel32.SetFileAttributesW(
-                        str(self.history_file), FILE_ATTRIBUTE_HIDDEN
-                    )
-                except Exception:
-                    pass  # Не критично, если не удалось скрыть
+            try:
+                # Перезапись существующего файла на месте: в отличие от
+                # создания заново, открытие скрытого файла не требует снимать
+                # с него атрибут "скрытый" (Windows)
+                with open(self.history_file, 'r+b') as f:
+                    f.write(data)
+                    f.truncate()
+            except FileNotFoundError:
+                with open(self.history_file, 'wb') as f:
+                    f.write(data)
+                self._hide_file()
         except IOError as e:
             print(f"[X] Ошибка сохранения истории: {e}")
+            return
+
+        if self._migrate_legacy:
+            self._migrate_legacy = False
+            try:
+                os.remove(self.legacy_history_file)
+            except OSError:
+                pass
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        """
+        Дописать запись в конец журнала.
+
+        Запись занимает одну строку и добавляется одним вызовом write,
+        поэтому стоимость не зависит от размера уже накопленной истории.
+        Когда журнал превышает COMPACT_THRESHOLD, он переписывается целиком.
+        """
+        if self._migrate_legacy:
+            self._save()
+            return
+
+        data = (json.dumps(entry, ensure_ascii=False) + "\n").encode('utf-8')
+
+        try:
+            # Режим дозаписи открывает скрытый файл без снятия атрибута (Windows)
+            with open(self.history_file, 'ab') as f:
+                is_new = f.tell() == 0
+                f.write(data)
+                size = f.tell()
+        except IOError as e:
+            print(f"[X] Ошибка сохранения истории: {e}")
+            return
+
+        if is_new:
+            self._hide_file()
+        elif size > self.COMPACT_THRESHOLD:
+            self._save()
+
+    def _hide_file(self) -> None:
+        """Установить атрибут "скрытый" для файла истории (Windows)."""
+        if os.name != 'nt':
+            return
+        try:
+            FILE_ATTRIBUTE_HIDDEN = 0x02
+            ctypes.windll.kernel32.SetFileAttributesW(
+                str(self.history_file), FILE_ATTRIBUTE_HIDDEN
+            )
+        except Exception:
+            pass  # Не критично, если не удалось скрыть
 
     def record(self, files_mapping: List[Dict[str, str]], operation: str = "rename") -> None:
         """
@@ -96,7 +234,7 @@ class HistoryManager:
         if len(self.history) > self.MAX_HISTORY_SIZE:
             self.history = self.history[:self.MAX_HISTORY_SIZE]
 
-        self._save()
+        self._append(entry)
 
     def get_history(self) -> List[Dict[str, Any]]:
         """Получить список операций."""
@@ -105,11 +243,36 @@ class HistoryManager:
     def clear(self) -> None:
         """Очистить всю историю."""
         self.history = []
-        if self.history_file.exists():
+        self._migrate_legacy = False
+        for history_file in (self.history_file, self.legacy_history_file):
+            if history_file.exists():
+                try:
+                    os.remove(history_file)
+                except OSError as e:
+                    print(f"[X] Ошибка удаления файла истории: {e}")
+
+    @staticmethod
+    def _name_key(name: str) -> str:
+        """Ключ имени файла с учётом регистронезависимых ФС (Windows, macOS)."""
+        if os.name == 'nt' or sys.platform == 'darwin':
+            return name.casefold()
+        return name
+
+    def _get_dir_names(self, cache: Dict[Path, Optional[Set[str]]],
+                       folder: Path) -> Optional[Set[str]]:
+        """
+        Получить множество имён в папке (кэшируется на время операции).
+
+        Returns:
+            множество ключей имён или None, если папки не существует
+        """
+        if folder not in cache:
             try:
-                os.remove(self.history_file)
-            except OSError as e:
-                print(f"[X] Ошибка удаления файла истории: {e}")
+                with os.scandir(folder) as entries:
+                    cache[folder] = {self._name_key(entry.name) for entry in entries}
+            except FileNotFoundError:
+                cache[folder] = None
+        return cache[folder]
 
     def undo(self) -> Tuple[bool, List[str], List[str]]:
         """
@@ -131,6 +294,11 @@ class HistoryManager:
         error_msgs = []
         files_processed = 0
 
+        # Снимок содержимого папок назначения: один os.scandir на папку
+        # вместо нескольких stat() на каждый файл
+        dir_names: Dict[Path, Optional[Set[str]]] = {}
+        empty_dir_candidates: Set[Path] = set()
+
         # Обрабатываем файлы в обратном порядке (на случай зависимостей)
         # Хотя для переименования это обычно не критично, но хорошая практика
         for item in reversed(files):
@@ -143,42 +311,59 @@ class HistoryManager:
             current_path = self.base_dir / new_rel_path
             original_path = self.base_dir / old_rel_path
 
-            if not current_path.exists():
-                error_msgs.append(f"Файл не найден (удален или перемещен): {new_rel_path}")
-                continue
-
-            if original_path.exists():
+            names = self._get_dir_names(dir_names, original_path.parent)
+            if names is not None and self._name_key(original_path.name) in names:
                 error_msgs.append(f"Целевой файл уже существует: {old_rel_path}")
                 continue
 
             try:
-                # Если файл был перемещен в подпапку, а мы возвращаем его в корень,
-                # папка назначения (корень) скорее всего существует.
-                # Но если "old" путь тоже был в подпапке, надо проверить её создание.
-                if not original_path.parent.exists():
+                # Если "old" путь был в подпапке, которой больше нет, создаём её
+                if names is None:
                     original_path.parent.mkdir(parents=True, exist_ok=True)
+                    names = dir_names[original_path.parent] = set()
 
-                os.rename(current_path, original_path)
+                # Отсутствие исходного файла обнаружит само переименование, а
+                # файл, появившийся на месте исходного после снимка, не будет затёрт
+                rename_noreplace(current_path, original_path)
                 success_msgs.append(f"Откат: {new_rel_path} -> {old_rel_path}")
                 files_processed += 1
-                
-                # Попытка удалить пустую папку, если файл был единственным в ней
-                # (актуально при "Группировке по папкам")
-                if current_path.parent != self.base_dir:
-                    try:
-                        current_path.parent.rmdir()  # Удалит только если пустая
-                    except OSError:
-                        pass # Папка не пуста, это нормально
 
+                names.add(self._name_key(original_path.name))
+                current_names = dir_names.get(current_path.parent)
+                if current_names:
+                    current_names.discard(self._name_key(current_path.name))
+
+                # Папки, созданные при "Группировке по папкам", удаляем после
+                # цикла одним проходом, если они опустели
+                folder = current_path.parent
+                while (folder != original_path.parent and folder != self.base_dir
+                       and self.base_dir in folder.parents):
+                    empty_dir_candidates.add(folder)
+                    folder = folder.parent
+
+            except FileExistsError:
+                error_msgs.append(f"Целевой файл уже существует: {old_rel_path}")
+            except FileNotFoundError:
+                error_msgs.append(f"Файл не найден (удален или перемещен): {new_rel_path}")
             except OSError as e:
                 error_msgs.append(f"Ошибка переименования {new_rel_path}: {e}")
 
+        # Самые глубокие папки первыми, чтобы вложенные пустые папки схлопнулись
+        for folder in sorted(empty_dir_candidates, key=lambda p: len(p.parts), reverse=True):
+            try:
+                folder.rmdir()  # Удалит только если пустая
+            except OSError:
+                pass  # Папка не пуста, это нормально
+
         # Удаляем операцию из истории, только если хоть что-то попытались сделать
         # или если операция была фактически пустой или невыполнимой, 
         # чтобы пользователь не застрял на ней.
         # В данном случае, удаляем, так как попытка отката совершена.
         self.history.pop(0)
-        self._save()
+        self._append({
+            "timestamp": datetime.now().isoformat(),
+            "operation": self.UNDO_OPERATION
+        })
 
         return files_processed > 0, success_msgs, error_msgs
 
@@ -221,7 +406,7 @@ if __name__ == "__main__":
     print("3. Операция записана в историю.")
     
     # Проверка скрытости файла (только визуально или через атрибуты)
-    hist_file = test_dir / ".rename_history.json"
+    hist_file = manager.history_file
     if hist_file.exists():
         print(f"4. Файл истории создан: {hist_file}")
     
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кэш извлечённых дат медиафайлов между запусками.
+Версия: 1.0
+Дата: 2026-10-15
+"""
+
+import ctypes
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+
+class MediaDateCache:
+    """
+    Кэш дат из EXIF и ffprobe для файлов одной папки.
+
+    Дата файла считается актуальной, пока не изменились его время
+    модификации (st_mtime_ns) и размер: проверка стоит одного stat()
+    вместо чтения метаданных или запуска ffprobe.
+    """
+
+    CACHE_FILENAME = ".rename_media_cache.json"
+    # Версия формата файла кэша; при несовпадении кэш строится заново
+    VERSION = 1
+
+    def __init__(self, base_dir: Union[str, Path]):
+        """
+        Инициализация кэша.
+
+        Args:
+            base_dir: папка, в которой выполняется переименование и где хранится кэш
+        """
+        self.base_dir = str(base_dir)
+        self.cache_file = Path(base_dir) / self.CACHE_FILENAME
+        # {относительный_путь: [st_mtime_ns, st_size, дата_ISO, источник]}
+        self._entries: Dict[str, List] = self._load()
+        # Записи файлов, встреченных в текущем запуске; только они сохраняются,
+        # поэтому удалённые и переименованные файлы выпадают из кэша
+        self._seen: Dict[str, List] = {}
+        self._dirty = False
+
+    def _load(self) -> Dict[str, List]:
+        """Загрузить кэш из файла (пустой словарь, если файла нет или он повреждён)."""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return {}
+        files = data.get("files")
+        return files if isinstance(files, dict) else {}
+
+    def _key(self, file_path: str) -> str:
+        """Ключ записи: путь относительно папки кэша."""
+        return os.path.relpath(file_path, self.base_dir)
+
+    def get(self, file_path: str, stat: os.stat_result) -> Optional[Tuple[datetime, str]]:
+        """
+        Получить сохранённую дату файла.
+
+        Args:
+            file_path: путь к файлу
+            stat: текущий результат stat() файла
+
+        Returns:
+            кортеж (datetime, источник_даты) или None если записи нет или файл изменился
+        """
+        key = self._key(file_path)
+        entry = self._entries.get(key)
+        # Повреждённая или изменённая вручную запись считается промахом кэша
+        if (not isinstance(entry, list) or len(entry) != 4
+                or entry[0] != stat.st_mtime_ns or entry[1] != stat.st_size):
+            return None
+
+        try:
+            date = datetime.fromisoformat(entry[2])
+        except (TypeError, ValueError):
+            return None
+
+        self._seen[key] = entry
+        return date, entry[3]
+
+    def put(self, file_path: str, stat: os.stat_result, date: datetime, source: str) -> None:
+        """
+        Запомнить дату файла.
+
+        Args:
+            file_path: путь к файлу
+            stat: результат stat() файла на момент извлечения даты
+            date: извлечённая дата
+            source: источник даты ("EXIF", "metadata")
+        """
+        self._seen[self._key(file_path)] = [stat.st_mtime_ns, stat.st_size, date.isoformat(), source]
+        self._dirty = True
+
+    def move(self, old_path: str, new_path: str) -> None:
+        """
+        Перенести запись на новое имя файла.
+
+        Переименование и перемещение не меняют время модификации и размер,
+        поэтому дата остаётся действительной для файла под новым именем.
+
+        Args:
+            old_path: путь к файлу до переименования
+            new_path: путь к файлу после переименования
+        """
+        entry = self._seen.pop(self._key(old_path), None)
+        if entry is not None:
+            self._seen[self._key(new_path)] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        """Сохранить записи текущего запуска, если кэш изменился."""
+        if not self._dirty and len(self._seen) == len(self._entries):
+            return
+
+        data = json.dumps(
+            {"version": self.VERSION, "files": self._seen},
+            ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+        try:
+            try:
+                # Перезапись на месте, как и у журнала истории: скрытый файл
+                # в Windows нельзя открыть на создание заново
+                with open(self.cache_file, 'r+b') as f:
+                    f.write(data)
+                    f.truncate()
+            except FileNotFoundError:
+                with open(self.cache_file, 'wb') as f:
+                    f.write(data)
+                self._hide_file()
+        except OSError:
+            # Кэш необязателен: при следующем запуске даты будут извлечены заново
+            return
+
+        self._entries = dict(self._seen)
+        self._dirty = False
+
+    def _hide_file(self) -> None:
+        """Установить атрибут "скрытый" для файла кэша (Windows)."""
+        if os.name != 'nt':
+            return
+        try:
+            FILE_ATTRIBUTE_HIDDEN = 0x02
+            ctypes.windll.kernel32.SetFileAttributesW(
+                str(self.cache_file), FILE_ATTRIBUTE_HIDDEN
+            )
+        except Exception:
+            pass  # Не критично, если не удалось скрыть
@@ -13,36 +13,53 @@
 import os
 import sys
 import re
-from datetime import datetime
+import functools
+import struct
+import importlib.util
+from datetime import datetime, timedelta
 from pathlib import Path
 import subprocess
 import json
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Set, Iterator
 
 # Импорт новых модулей для v1.2
 try:
     from template_parser import TemplateParser
     from folder_organizer import FolderOrganizer
-    from history_manager import HistoryManager
+    from history_manager import HistoryManager, rename_noreplace
+    from media_date_cache import MediaDateCache
 except ImportError:
-    print("❌ Ошибка: не найдены модули template_parser, folder_organizer или history_manager")
-    print("Убедитесь что файлы template_parser.py, folder_organizer.py и history_manager.py находятся в той же папке")
+    print("❌ Ошибка: не найдены модули template_parser, folder_organizer, history_manager или media_date_cache")
+    print("Убедитесь что файлы template_parser.py, folder_organizer.py, history_manager.py и media_date_cache.py находятся в той же папке")
     sys.exit(1)
 
-try:
-    from PIL import Image
-    from PIL.ExifTags import TAGS
-except ImportError:
+# Pillow импортируется при первом обращении к фото (см. _load_pil): импорт
+# регистрирует десятки форматов и заметно замедляет запуск, а для --help
+# и папок только с видео не нужен. Здесь лишь проверяем, что он установлен
+Image = None
+
+if importlib.util.find_spec("PIL") is None:
     print("❌ Ошибка: не установлена библиотека Pillow")
     print("Установите её командой: pip install Pillow")
     sys.exit(1)
 
+
+def _load_pil():
+    """Импортировать PIL.Image при первом вызове и вернуть модуль."""
+    global Image
+    if Image is None:
+        from PIL import Image as _Image
+        Image = _Image
+    return Image
+
+
 # =============================================================================
 # КОНФИГУРАЦИЯ
 # =============================================================================
 
 # Полный список поддерживаемых форматов фото (26 расширений)
-PHOTO_EXTENSIONS = {
+PHOTO_EXTENSIONS = frozenset({
     # JPEG форматы
     '.jpg', '.jpeg', '.jpe', '.jfif',
     # PNG
@@ -65,10 +82,10 @@ PHOTO_EXTENSIONS = {
     '.ico',   # Icon
     '.pcx',   # PC Paintbrush
     '.tga'    # Targa
-}
+})
 
 # Полный список поддерживаемых форматов видео (23 расширения)
-VIDEO_EXTENSIONS = {
+VIDEO_EXTENSIONS = frozenset({
     # MPEG-4
     '.mp4', '.m4v', '.m4p',
     # QuickTime
@@ -95,22 +112,89 @@ VIDEO_EXTENSIONS = {
     '.mts', '.m2ts',
     # Transport Stream
     '.ts'
-}
+})
+
+# Все поддерживаемые расширения и отсортированные списки для справки:
+# вычисляются один раз при загрузке модуля
+SUPPORTED_EXTENSIONS = PHOTO_EXTENSIONS | VIDEO_EXTENSIONS
+_SORTED_PHOTO = tuple(sorted(PHOTO_EXTENSIONS))
+_SORTED_VIDEO = tuple(sorted(VIDEO_EXTENSIONS))
+
+# Тип файла по расширению: расширение -> (префикс имени, is_video).
+# Один поиск в словаре вместо двух проверок по множествам.
+EXT_KIND = {ext: ("Photo", False) for ext in PHOTO_EXTENSIONS}
+EXT_KIND.update({ext: ("Video", True) for ext in VIDEO_EXTENSIONS})
 
-# Правильный формат даты (ISO 8601): год-месяц-день_часминутсекунд
+# Правильный формат даты (ISO 8601): год-месяц-день_часминутсекунд.
+# Имена строит fmt_dt(), константа описывает формат и служит для проверки
 DATE_FORMAT = "%Y-%m-%d_%H%M%S"
 
 # Регулярное выражение для проверки уже переименованных файлов
 # Формат: Photo-YYYY-MM-DD_HHMMSS[_N].ext или Video-YYYY-MM-DD_HHMMSS[_N].ext
+# Применяется через fullmatch (якоря ^ и $ не нужны);
+# re.ASCII: имена проверяются только на ASCII-цифры и буквы расширения
 RENAMED_PATTERN = re.compile(
-    r'^(Photo|Video)-(\d{4})-(\d{2})-(\d{2})_(\d{6})(_\d+)?\.(\w+)$',
-    re.IGNORECASE
+    r'(Photo|Video)-(\d{4})-(\d{2})-(\d{2})_(\d{6})(_\d+)?\.(\w+)',
+    re.IGNORECASE | re.ASCII
 )
+# Связанный метод fullmatch: без поиска атрибута на каждый вызов
+_RENAMED_FULLMATCH = RENAMED_PATTERN.fullmatch
+
+# Префиксы переименованных файлов (в нижнем регистре) для быстрой проверки
+RENAMED_PREFIXES = ('photo-', 'video-')
+# Первые символы таких имён: большинство имён (IMG_, DSC, 2024...) отсекаются
+# по одному символу, без создания строки в нижнем регистре
+RENAMED_FIRST_CHARS = frozenset('PpVv')
+
+# EXIF теги с датой в порядке приоритета: (указатель на вложенный IFD или None, ID тега)
+EXIF_IFD_POINTER = 0x8769  # ExifIFDPointer: DateTimeOriginal и CreateDate лежат в Exif IFD
+EXIF_DATE_TAGS = (
+    (EXIF_IFD_POINTER, 0x9003),  # DateTimeOriginal (дата съёмки)
+    (None, 0x0132),              # DateTime (дата создания, IFD0)
+    (EXIF_IFD_POINTER, 0x9004),  # CreateDate (DateTimeDigitized)
+)
+
+# JPEG файлы, для которых EXIF читается напрямую из сегмента APP1 без Pillow
+JPEG_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.jpe', '.jfif'})
+
+# Видео в контейнере ISO BMFF / QuickTime: дата создания хранится в атоме mvhd
+QUICKTIME_EXTENSIONS = frozenset({'.mp4', '.m4v', '.m4p', '.mov', '.qt', '.3gp', '.3g2', '.f4v'})
+# Секунд между 1904-01-01 (эпоха QuickTime) и 1970-01-01
+QUICKTIME_EPOCH_OFFSET = 2082844800
+
+# Сколько байт из начала JPEG читать в поисках EXIF (APP1 не длиннее 64 КБ)
+JPEG_HEADER_SIZE = 65536
+
+# Результат обработки файла (process_file) и соответствующий ключ статистики
+STATUS_OK, STATUS_SKIP, STATUS_ERR = 0, 1, 2
+STATUS_STATS_KEYS = ('success', 'skipped', 'errors')
+
+# Внутренняя ширина рамки предупреждений в консоли (в символах)
+BOX_WIDTH = 68
+
+# Число потоков для извлечения метаданных.
+# Фото: чтение заголовков с диска; видео: ожидание процессов ffprobe,
+# поэтому для видео потоков больше, чем ядер.
+PHOTO_WORKERS = os.cpu_count() or 1
+VIDEO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Сколько строк результата копить перед выводом в консоль.
+# Консоль буферизуется построчно: каждый print() — отдельная запись
+# (в Windows — медленный WriteConsoleW), пачка выводится одной записью.
+OUTPUT_BATCH_SIZE = 256
 
 # =============================================================================
 # ФУНКЦИИ ДЛЯ ИЗВЛЕЧЕНИЯ ДАТЫ ИЗ МЕТАДАННЫХ
 # =============================================================================
 
+def _match_renamed(filename: str) -> Optional[re.Match]:
+    """Сопоставить имя с форматом переименованных файлов (None если не подходит)."""
+    # Большинство имён отсекается по первым символам, без регулярного выражения
+    if filename[:1] not in RENAMED_FIRST_CHARS or filename[:6].lower() not in RENAMED_PREFIXES:
+        return None
+    return _RENAMED_FULLMATCH(filename)
+
+
 def is_already_renamed(filename: str) -> Tuple[bool, str]:
     """
     Проверить, соответствует ли имя файла шаблону переименования.
@@ -128,12 +212,214 @@ def is_already_renamed(filename: str) -> Tuple[bool, str]:
         >>> is_already_renamed("IMG_20230815.jpg")
         (False, "")
     """
-    match = RENAMED_PATTERN.match(filename)
+    match = _match_renamed(filename)
     if match:
-        prefix = match.group(1)  # "Photo" или "Video"
-        return True, prefix
+        return True, match.group(1)  # "Photo" или "Video"
     return False, ""
 
+
+def get_renamed_name_date(filename: str) -> Optional[datetime]:
+    """
+    Получить дату, записанную в имени уже переименованного файла.
+
+    Args:
+        filename: имя файла (без пути)
+
+    Returns:
+        datetime из имени или None, если имя не по шаблону
+        или дата в нём несуществующая (например, месяц 13)
+    """
+    match = _match_renamed(filename)
+    if not match:
+        return None
+    year, month, day, hms = match.group(2, 3, 4, 5)
+    # Группы уже проверены шаблоном на цифры: int() вместо strptime
+    try:
+        return datetime(int(year), int(month), int(day),
+                        int(hms[:2]), int(hms[2:4]), int(hms[4:]))
+    except ValueError:
+        return None
+
+def classify(filename: str) -> Optional[Tuple[str, bool]]:
+    """
+    Определить тип медиафайла по имени.
+
+    Args:
+        filename: имя файла (без пути)
+
+    Returns:
+        ("Photo", False) или ("Video", True); None если формат не поддерживается
+    """
+    # rpartition не создаёт объект Path; имена без расширения и скрытые
+    # файлы вида ".jpg" (пустая основа) расширения не имеют, как и в Path.suffix
+    stem, _, ext = filename.rpartition('.')
+    if not stem:
+        return None
+    return EXT_KIND.get('.' + ext.lower())
+
+
+def _fast_exif_dt(date_str: str) -> Optional[datetime]:
+    """
+    Быстро разобрать дату фиксированного формата без strptime.
+
+    Поддерживает "YYYY:MM:DD HH:MM:SS" (EXIF), а также "YYYY-MM-DD HH:MM:SS"
+    и "YYYY-MM-DDTHH:MM:SS" (ffprobe). Строка приводится к ISO и разбирается
+    datetime.fromisoformat, реализованным на C.
+
+    Args:
+        date_str: строка с датой (длиной не менее 19 символов)
+
+    Returns:
+        объект datetime или None если строка не разобрана
+    """
+    try:
+        if len(date_str) < 19:
+            return None
+        date_str = date_str[:19]
+        if date_str[4] == ':':
+            # EXIF: "2023:08:15 14:22:03" -> "2023-08-15 14:22:03"
+            date_str = date_str.replace(':', '-', 2)
+        return datetime.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_exif_dt(date_str: str) -> Optional[datetime]:
+    """
+    Разобрать строку даты из EXIF.
+
+    Args:
+        date_str: значение тега, например "2023:08:15 14:22:03"
+
+    Returns:
+        объект datetime или None если формат не распознан
+    """
+    # Быстрый разбор по фиксированным позициям
+    date = _fast_exif_dt(date_str)
+    if date:
+        return date
+
+    # Обработка разных форматов дат
+    try:
+        # Стандартный формат EXIF: "2023:08:15 14:22:03"
+        return datetime.strptime(date_str[:19], '%Y:%m:%d %H:%M:%S')
+    except (ValueError, TypeError):
+        try:
+            # Альтернативный формат: "2023-08-15 14:22:03"
+            return datetime.strptime(date_str[:19], '%Y-%m-%d %H:%M:%S')
+        except (ValueError, TypeError):
+            return None
+
+
+def _read_ifd_entries(tiff: bytes, offset: int, byte_order: str,
+                    wanted: Tuple[int, ...]) -> Dict[int, Tuple[int, int, int]]:
+    """
+    Прочитать записи одного IFD из TIFF заголовка EXIF.
+
+    Args:
+        tiff: байты TIFF заголовка (начиная с "II"/"MM")
+        offset: смещение IFD относительно начала tiff
+        byte_order: '<' или '>' для struct
+        wanted: ID тегов, которые нужно найти
+
+    Returns:
+        словарь {ID тега: (тип, количество, значение_или_смещение)}
+    """
+    found = {}
+    if offset + 2 > len(tiff):
+        return found
+
+    (count,) = struct.unpack_from(byte_order + 'H', tiff, offset)
+    entry = offset + 2
+    end = min(entry + count * 12, len(tiff) - 11)
+
+    while entry < end:
+        tag, value_type, value_count, value = struct.unpack_from(byte_order + 'HHII', tiff, entry)
+        if tag in wanted:
+            found[tag] = (value_type, value_count, value)
+        entry += 12
+
+    return found
+
+
+def _jpeg_exif_dt(file_path: str) -> Optional[datetime]:
+    """
+    Извлечь дату съёмки из JPEG, разобрав сегмент APP1 напрямую.
+
+    Читается только начало файла (JPEG_HEADER_SIZE байт): маркеры JPEG
+    до сегмента APP1 с EXIF, затем IFD0 и Exif IFD. Приоритет тегов тот же,
+    что и в get_photo_creation_date.
+
+    Args:
+        file_path: путь к JPEG файлу
+
+    Returns:
+        объект datetime или None если дату найти не удалось
+        (тогда используется разбор через Pillow)
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(JPEG_HEADER_SIZE)
+    except OSError:
+        return None
+
+    if head[:2] != b'\xff\xd8':
+        return None
+
+    # Ищем сегмент APP1 с EXIF среди маркеров перед данными изображения
+    pos = 2
+    tiff = None
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            # Байт-заполнитель перед маркером
+            pos += 1
+            continue
+        if marker in (0xDA, 0xD9):
+            # Начало данных изображения или конец файла: EXIF нет
+            return None
+        (length,) = struct.unpack_from('>H', head, pos + 2)
+        if marker == 0xE1 and head[pos + 4:pos + 10] == b'Exif\x00\x00':
+            tiff = head[pos + 10:pos + 2 + length]
+            break
+        pos += 2 + length
+
+    if not tiff or len(tiff) < 8:
+        return None
+
+    if tiff[:2] == b'II':
+        byte_order = '<'
+    elif tiff[:2] == b'MM':
+        byte_order = '>'
+    else:
+        return None
+
+    try:
+        (ifd0_offset,) = struct.unpack_from(byte_order + 'I', tiff, 4)
+        tags = _read_ifd_entries(tiff, ifd0_offset, byte_order, (0x0132, EXIF_IFD_POINTER))
+        if EXIF_IFD_POINTER in tags:
+            tags.update(_read_ifd_entries(tiff, tags[EXIF_IFD_POINTER][2], byte_order,
+                                        (0x9003, 0x9004)))
+    except struct.error:
+        return None
+
+    for _, tag_id in EXIF_DATE_TAGS:
+        if tag_id not in tags:
+            continue
+        value_type, value_count, value_offset = tags[tag_id]
+        # Даты хранятся как ASCII (тип 2) длиной 20 байт, поэтому всегда по смещению
+        if value_type != 2 or value_count <= 4:
+            continue
+        raw = tiff[value_offset:value_offset + value_count]
+        date = _parse_exif_dt(raw.rstrip(b'\x00').decode('latin-1'))
+        if date:
+            return date
+
+    return None
+
+
 def get_photo_creation_date(file_path: str) -> Optional[datetime]:
     """
     Извлечь дату создания фото из EXIF метаданных.
@@ -149,36 +435,38 @@ def get_photo_creation_date(file_path: str) -> Optional[datetime]:
     Returns:
         объект datetime или None если метаданные не найдены
     """
+    # Для JPEG сначала пробуем прочитать EXIF напрямую, без Pillow
+    if os.path.splitext(file_path)[1].lower() in JPEG_EXTENSIONS:
+        date = _jpeg_exif_dt(file_path)
+        if date:
+            return date
+
     try:
-        with Image.open(file_path) as image:
-            # Получаем EXIF данные
-            exifdata = image._getexif()
+        # Image.open читает только заголовок: пиксели не декодируются,
+        # а getexif() разбирает IFD лениво, по запрошенным тегам
+        with _load_pil().open(file_path) as image:
+            exif = image.getexif()
 
-            if not exifdata:
+            if not exif:
                 return None
 
-            # Приоритетные теги для поиска
-            priority_tags = ['DateTimeOriginal', 'DateTime', 'CreateDate']
-
-            # Создаём словарь тег:значение
-            exif_dict = {TAGS.get(tag_id, tag_id): value
-                        for tag_id, value in exifdata.items()}
+            exif_ifd = None
 
             # Ищем по приоритету
-            for tag_name in priority_tags:
-                if tag_name in exif_dict:
-                    date_str = exif_dict[tag_name]
-
-                    # Обработка разных форматов дат
-                    try:
-                        # Стандартный формат EXIF: "2023:08:15 14:22:03"
-                        return datetime.strptime(date_str[:19], '%Y:%m:%d %H:%M:%S')
-                    except (ValueError, TypeError):
-                        try:
-                            # Альтернативный формат: "2023-08-15 14:22:03"
-                            return datetime.strptime(date_str[:19], '%Y-%m-%d %H:%M:%S')
-                        except (ValueError, TypeError):
-                            continue
+            for ifd_pointer, tag_id in EXIF_DATE_TAGS:
+                if ifd_pointer is None:
+                    date_str = exif.get(tag_id)
+                else:
+                    if exif_ifd is None:
+                        exif_ifd = exif.get_ifd(ifd_pointer)
+                    date_str = exif_ifd.get(tag_id)
+
+                if not date_str:
+                    continue
+
+                date = _parse_exif_dt(date_str)
+                if date:
+                    return date
 
     except Exception as e:
         # Если файл повреждён или формат не поддерживается PIL
@@ -187,43 +475,178 @@ def get_photo_creation_date(file_path: str) -> Optional[datetime]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def check_ffprobe_available() -> bool:
-    """Проверить доступность ffprobe в системе."""
+    """
+    Проверить доступность ffprobe в системе.
+
+    Результат кэшируется: проверка запускает процесс только один раз за сеанс.
+    """
     try:
         subprocess.run(['ffprobe', '-version'],
-                      stdout=subprocess.PIPE,
-                      stderr=subprocess.PIPE,
+                      stdin=subprocess.DEVNULL,
+                      stdout=subprocess.DEVNULL,
+                      stderr=subprocess.DEVNULL,
                       timeout=5)
         return True
     except (FileNotFoundError, subprocess.TimeoutExpired):
         return False
 
 
-def get_video_creation_date(file_path: str) -> Optional[datetime]:
+def _parse_creation_time(creation_time: str) -> Optional[datetime]:
+    """
+    Разобрать значение creation_time из вывода ffprobe.
+
+    Args:
+        creation_time: строка вида "2023-08-15T14:22:03.000000Z" или "2023-08-15 14:22:03"
+
+    Returns:
+        объект datetime или None если формат не распознан
+    """
+    try:
+        # Убираем микросекунды и Z
+        clean_time = creation_time.replace('Z', '').split('.')[0]
+
+        # Быстрый разбор по фиксированным позициям
+        date = _fast_exif_dt(clean_time)
+        if date:
+            return date
+
+        # Пробуем ISO формат
+        if 'T' in clean_time:
+            return datetime.fromisoformat(clean_time)
+        return datetime.strptime(clean_time, '%Y-%m-%d %H:%M:%S')
+    except (ValueError, AttributeError):
+        return None
+
+
+def _find_atom(f, start: int, end: int, atom_type: bytes) -> Optional[Tuple[int, int]]:
+    """
+    Найти атом ISO BMFF среди атомов одного уровня.
+
+    Заголовки читаются с переходом через seek, поэтому данные (mdat)
+    не читаются, даже если moov записан в конце файла.
+
+    Returns:
+        (начало_содержимого, конец_атома) или None если атом не найден
+    """
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(16)
+        if len(header) < 8:
+            return None
+        size, kind = struct.unpack_from('>I4s', header)
+        header_size = 8
+        if size == 1:
+            # 64-битный размер сразу после типа
+            if len(header) < 16:
+                return None
+            (size,) = struct.unpack_from('>Q', header, 8)
+            header_size = 16
+        elif size == 0:
+            # Атом до конца файла
+            size = end - pos
+        if size < header_size:
+            return None
+        if kind == atom_type:
+            return pos + header_size, min(pos + size, end)
+        pos += size
+    return None
+
+
+def _quicktime_creation_dt(file_path: str) -> Optional[datetime]:
+    """
+    Извлечь дату создания из атома moov/mvhd (MP4, MOV, 3GP) без ffprobe.
+
+    ffprobe берёт creation_time для этих форматов из того же поля,
+    поэтому результат совпадает с его выводом (время в UTC).
+
+    Args:
+        file_path: путь к видео файлу
+
+    Returns:
+        объект datetime или None если дату найти не удалось
+        (тогда используется ffprobe)
+    """
+    try:
+        with open(file_path, 'rb') as f:
+            end = f.seek(0, os.SEEK_END)
+            moov = _find_atom(f, 0, end, b'moov')
+            if moov is None:
+                return None
+            mvhd = _find_atom(f, moov[0], moov[1], b'mvhd')
+            if mvhd is None:
+                return None
+            f.seek(mvhd[0])
+            data = f.read(12)
+    except OSError:
+        return None
+
+    try:
+        # Версия 1: 64-битные времена, версия 0: 32-битные
+        if data[0] == 1:
+            (seconds,) = struct.unpack_from('>Q', data, 4)
+        else:
+            (seconds,) = struct.unpack_from('>I', data, 4)
+    except (IndexError, struct.error):
+        return None
+
+    if not seconds:
+        # Нулевое значение: камера дату не записала
+        return None
+    # Как и ffmpeg: значения меньше смещения считаем уже отсчитанными от 1970 года
+    if seconds >= QUICKTIME_EPOCH_OFFSET:
+        seconds -= QUICKTIME_EPOCH_OFFSET
+
+    try:
+        return datetime(1970, 1, 1) + timedelta(seconds=seconds)
+    except OverflowError:
+        return None
+
+
+def get_video_creation_date(file_path: str, has_ffprobe: Optional[bool] = None) -> Optional[datetime]:
     """
     Извлечь дату создания видео через ffprobe.
 
     Args:
         file_path: путь к видео файлу
+        has_ffprobe: результат check_ffprobe_available(), если он уже известен
+            вызывающему коду (None — проверить здесь)
 
     Returns:
         объект datetime или None если метаданные не найдены
     """
+    # MP4/MOV: дата читается из заголовка файла, процесс не запускается
+    if os.path.splitext(file_path)[1].lower() in QUICKTIME_EXTENSIONS:
+        date = _quicktime_creation_dt(file_path)
+        if date:
+            return date
+
+    # Без ffprobe не тратим время на запуск процесса, который всё равно упадёт
+    if has_ffprobe is None:
+        has_ffprobe = check_ffprobe_available()
+    if not has_ffprobe:
+        return None
+
     try:
         # Команда ffprobe для получения метаданных
         cmd = [
             'ffprobe',
+            '-hide_banner',
             '-v', 'quiet',
             '-print_format', 'json',
             '-show_entries', 'format_tags=creation_time',
             file_path
         ]
 
+        # Вывод читаем байтами: json.loads сам декодирует UTF-8, а stderr
+        # и stdin ffprobe не нужны
         result = subprocess.run(
             cmd,
+            stdin=subprocess.DEVNULL,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+            stderr=subprocess.DEVNULL,
             timeout=30
         )
 
@@ -235,18 +658,7 @@ def get_video_creation_date(file_path: str) -> Optional[datetime]:
                 creation_time = data['format']['tags'].get('creation_time')
 
                 if creation_time:
-                    # Форматы: "2023-08-15T14:22:03.000000Z" или "2023-08-15 14:22:03"
-                    try:
-                        # Убираем микросекунды и Z
-                        clean_time = creation_time.replace('Z', '').split('.')[0]
-
-                        # Пробуем ISO формат
-                        if 'T' in clean_time:
-                            return datetime.fromisoformat(clean_time)
-                        else:
-                            return datetime.strptime(clean_time, '%Y-%m-%d %H:%M:%S')
-                    except (ValueError, AttributeError):
-                        pass
+                    return _parse_creation_time(creation_time)
 
     except (FileNotFoundError, subprocess.TimeoutExpired, json.JSONDecodeError):
         pass
@@ -254,17 +666,54 @@ def get_video_creation_date(file_path: str) -> Optional[datetime]:
     return None
 
 
-def get_file_creation_date(file_path: str) -> datetime:
+def get_video_creation_dates(file_paths: List[str],
+                             has_ffprobe: Optional[bool] = None) -> Dict[str, datetime]:
+    """
+    Извлечь даты создания для набора видео предварительным проходом.
+
+    ffprobe принимает только один входной файл, поэтому объединить несколько
+    видео в один вызов нельзя. Для MP4/MOV/3GP дата читается прямо из файла
+    (см. _quicktime_creation_dt), и процесс не нужен вовсе; для остальных
+    форматов процессы ffprobe запускаются параллельно в пуле потоков.
+
+    Args:
+        file_paths: список путей к видео файлам
+        has_ffprobe: доступен ли ffprobe (None — проверить)
+
+    Returns:
+        словарь {путь: datetime} только для файлов, у которых найдена дата
+    """
+    dates: Dict[str, datetime] = {}
+
+    if not file_paths:
+        return dates
+
+    if has_ffprobe is None:
+        has_ffprobe = check_ffprobe_available()
+    extract = functools.partial(get_video_creation_date, has_ffprobe=has_ffprobe)
+
+    with ThreadPoolExecutor(max_workers=VIDEO_WORKERS) as pool:
+        for file_path, date in zip(file_paths, pool.map(extract, file_paths)):
+            if date:
+                dates[file_path] = date
+
+    return dates
+
+
+def get_file_creation_date(file_path: str, stat: Optional[os.stat_result] = None) -> datetime:
     """
     Получить дату создания файла из файловой системы (fallback метод).
 
     Args:
         file_path: путь к файлу
+        stat: готовый результат stat (например, DirEntry.stat()),
+            чтобы не вызывать os.stat повторно
 
     Returns:
         объект datetime с датой создания файла
     """
-    stat = os.stat(file_path)
+    if stat is None:
+        stat = os.stat(file_path)
 
     # В Windows: st_ctime = дата создания
     # В Unix: st_ctime = дата последнего изменения метаданных
@@ -274,20 +723,30 @@ def get_file_creation_date(file_path: str) -> datetime:
     return datetime.fromtimestamp(creation_time)
 
 
-def get_media_date(file_path: str, is_video: bool) -> Tuple[Optional[datetime], str]:
+def get_media_date(file_path: str, is_video: bool,
+                   video_dates: Optional[Dict[str, datetime]] = None,
+                   stat: Optional[os.stat_result] = None,
+                   has_ffprobe: Optional[bool] = None) -> Tuple[Optional[datetime], str]:
     """
     Получить дату медиафайла с указанием источника.
 
     Args:
         file_path: путь к файлу
         is_video: True если это видео, False если фото
+        video_dates: заранее извлечённые даты видео (см. get_video_creation_dates).
+            Если передан, ffprobe для отдельного файла не запускается.
+        stat: готовый результат stat файла для fallback (опционально)
+        has_ffprobe: доступен ли ffprobe (None — проверить)
 
     Returns:
         кортеж (datetime, источник_даты)
     """
     # Пытаемся извлечь из метаданных
     if is_video:
-        date = get_video_creation_date(file_path)
+        if video_dates is not None:
+            date = video_dates.get(file_path)
+        else:
+            date = get_video_creation_date(file_path, has_ffprobe)
         if date:
             return date, "metadata"
     else:
@@ -296,17 +755,125 @@ def get_media_date(file_path: str, is_video: bool) -> Tuple[Optional[datetime],
             return date, "EXIF"
 
     # Fallback на дату файла
-    date = get_file_creation_date(file_path)
+    date = get_file_creation_date(file_path, stat)
     return date, "file_system"
 
 
+def _extract_one(path_is_video: Tuple[str, bool], video_dates: Dict[str, datetime],
+                 file_stats: Dict[str, os.stat_result]) -> Tuple[str, Tuple[Optional[datetime], str]]:
+    """Извлечь дату одного файла (задача для пула потоков)."""
+    path, is_video = path_is_video
+    return path, get_media_date(path, is_video, video_dates, file_stats.get(path))
+
+
+def extract_media_dates(files: List[Tuple[str, bool]],
+                        cache: Optional[MediaDateCache] = None,
+                        file_stats: Optional[Dict[str, os.stat_result]] = None,
+                        has_ffprobe: Optional[bool] = None
+                        ) -> Dict[str, Tuple[Optional[datetime], str]]:
+    """
+    Извлечь даты для набора медиафайлов параллельно.
+
+    Файлы независимы друг от друга, поэтому чтение EXIF и запуск ffprobe
+    выполняются в пуле потоков. Переименование при этом остаётся
+    последовательным (см. scan_and_rename).
+
+    Args:
+        files: список кортежей (путь, is_video)
+        cache: кэш дат между запусками (опционально). Неизменённые файлы
+            берутся из него, новые даты из метаданных записываются в него.
+        file_stats: уже известные результаты stat {путь: stat} (например,
+            из os.DirEntry); используются для кэша и даты файловой системы
+        has_ffprobe: доступен ли ffprobe (None — проверить)
+
+    Returns:
+        словарь {путь: (datetime, источник_даты)}
+    """
+    if not files:
+        return {}
+
+    dates = {}
+    file_stats = dict(file_stats) if file_stats else {}
+    if cache is not None:
+        pending = []
+        for path, is_video in files:
+            stat = file_stats.get(path)
+            if stat is None:
+                try:
+                    stat = file_stats[path] = os.stat(path)
+                except OSError:
+                    pending.append((path, is_video))
+                    continue
+            cached = cache.get(path, stat)
+            if cached:
+                dates[path] = cached
+            else:
+                pending.append((path, is_video))
+        files = pending
+
+    video_dates = get_video_creation_dates([path for path, is_video in files if is_video],
+                                           has_ffprobe)
+    extract = functools.partial(_extract_one, video_dates=video_dates, file_stats=file_stats)
+
+    with ThreadPoolExecutor(max_workers=PHOTO_WORKERS) as pool:
+        for path, (date, source) in pool.map(extract, files):
+            dates[path] = date, source
+            # Дата файловой системы дешёвая и меняется сама, её не кэшируем
+            stat = file_stats.get(path)
+            if cache is not None and stat is not None and date and source != "file_system":
+                cache.put(path, stat, date, source)
+
+    return dates
+
+
 # =============================================================================
 # ФУНКЦИИ ДЛЯ ПЕРЕИМЕНОВАНИЯ ФАЙЛОВ
 # =============================================================================
 
+def fmt_dt(date: datetime) -> str:
+    """
+    Отформатировать дату для имени файла (формат DATE_FORMAT).
+
+    Форматирование целых чисел быстрее strftime и не зависит от локали.
+
+    Examples:
+        >>> fmt_dt(datetime(2023, 8, 15, 14, 22, 3))
+        '2023-08-15_142203'
+    """
+    return (f"{date.year:04d}-{date.month:02d}-{date.day:02d}_"
+            f"{date.hour:02d}{date.minute:02d}{date.second:02d}")
+
+
+def _name_key(name: str) -> str:
+    """Ключ имени файла с учётом регистронезависимых ФС (Windows, macOS)."""
+    if os.name == 'nt' or sys.platform == 'darwin':
+        return name.casefold()
+    return name
+
+
+def _get_dir_names(name_cache: Dict[str, Set[str]], folder: str) -> Set[str]:
+    """
+    Получить множество ключей имён в папке (одним os.scandir, с кэшем).
+
+    Папка, которой ещё нет (например, будущая папка группировки) или
+    которую нельзя прочитать, даёт пустое множество: ошибка, если она
+    помешает переименованию, будет показана для этого файла.
+    """
+    names = name_cache.get(folder)
+    if names is None:
+        try:
+            with os.scandir(folder) as entries:
+                names = {_name_key(entry.name) for entry in entries}
+        except OSError:
+            names = set()
+        name_cache[folder] = names
+    return names
+
+
 def generate_new_filename(prefix: str, date: datetime, extension: str,
                          base_dir: str, template_parser: TemplateParser = None,
-                         folder_organizer: FolderOrganizer = None) -> Tuple[str, Path]:
+                         folder_organizer: FolderOrganizer = None,
+                         name_cache: Optional[Dict[str, Set[str]]] = None) -> Tuple[str, str]:
     """
     Сгенерировать новое имя файла, избегая дубликатов.
 
@@ -317,32 +884,51 @@ def generate_new_filename(prefix: str, date: datetime, extension: str,
         base_dir: директория где будет файл
         template_parser: парсер шаблонов (опционально)
         folder_organizer: организатор папок (опционально)
+        name_cache: кэш имён по папкам {папка: множество имён} (опционально).
+            Занятость имени проверяется по нему вместо stat() на каждый вариант,
+            выбранное имя сразу резервируется.
 
     Returns:
         кортеж (новое имя файла без пути, полный путь к целевой папке)
     """
     # Определяем целевую папку
     if folder_organizer:
-        target_dir = folder_organizer.get_folder_path(Path(base_dir), date)
+        target_dir = str(folder_organizer.get_folder_path(Path(base_dir), date))
     else:
-        target_dir = Path(base_dir)
+        target_dir = base_dir
     
     # Генерируем базовое имя
     if template_parser:
         base_name = template_parser.format(date, prefix)
     else:
         # Формат по умолчанию
-        date_str = date.strftime(DATE_FORMAT)
+        date_str = fmt_dt(date)
         base_name = f"{prefix}-{date_str}"
     
     new_name = f"{base_name}{extension}"
-    new_path = target_dir / new_name
+
+    if name_cache is not None:
+        # Шаблон может задавать подпапки ("{YYYY}/{MM}/..."): имена
+        # сверяются с содержимым той папки, где файл окажется на самом деле
+        sub_dir = os.path.dirname(base_name)
+        names = _get_dir_names(name_cache, os.path.join(target_dir, sub_dir) if sub_dir else target_dir)
+
+        # Если имя занято, добавляем счётчик
+        counter = 1
+        while _name_key(os.path.basename(new_name)) in names:
+            new_name = f"{base_name}_{counter}{extension}"
+            counter += 1
+
+        names.add(_name_key(os.path.basename(new_name)))
+        return new_name, target_dir
+
+    new_path = os.path.join(target_dir, new_name)
 
     # Если файл существует, добавляем счётчик
     counter = 1
-    while new_path.exists():
+    while os.path.exists(new_path):
         new_name = f"{base_name}_{counter}{extension}"
-        new_path = target_dir / new_name
+        new_path = os.path.join(target_dir, new_name)
         counter += 1
 
     return new_name, target_dir
@@ -350,76 +936,152 @@ def generate_new_filename(prefix: str, date: datetime, extension: str,
 
 def process_file(file_path: str, dry_run: bool = False,
                  template_parser: TemplateParser = None,
-                 folder_organizer: FolderOrganizer = None) -> Tuple[bool, str]:
+                 folder_organizer: FolderOrganizer = None,
+                 media_date: Optional[Tuple[Optional[datetime], str]] = None,
+                 name_cache: Optional[Dict[str, Set[str]]] = None,
+                 has_ffprobe: Optional[bool] = None
+                 ) -> Tuple[int, str, Optional[Tuple[str, str]]]:
     """
     Обработать один файл: определить дату и переименовать.
 
+    Пути обрабатываются как строки (os.path), без создания объектов Path.
+
     Args:
         file_path: полный путь к файлу
         dry_run: если True, не выполнять переименование, только показать что будет
         template_parser: парсер шаблонов (опционально)
         folder_organizer: организатор папок (опционально)
+        media_date: заранее извлечённая пара (дата, источник), см. extract_media_dates
+        name_cache: кэш имён по папкам, см. generate_new_filename
+        has_ffprobe: доступен ли ffprobe, если дата не передана (None — проверить)
 
     Returns:
-        (успех, сообщение, кортеж_путей_или_None)
+        (статус, сообщение, кортеж_путей_или_None)
+        статус = STATUS_OK, STATUS_SKIP или STATUS_ERR
         кортеж_путей = (старый_путь, новый_путь)
     """
-    path_obj = Path(file_path)
-    ext = path_obj.suffix.lower()
+    parent_dir, name = os.path.split(file_path)
+    ext = os.path.splitext(name)[1].lower()
 
     # Определяем тип файла
-    if ext in PHOTO_EXTENSIONS:
-        prefix = "Photo"
-        is_video = False
-    elif ext in VIDEO_EXTENSIONS:
-        prefix = "Video"
-        is_video = True
-    else:
-        return False, f"[?] Пропущен (неподдерживаемый формат): {path_obj.name}", None
+    kind = EXT_KIND.get(ext)
+    if kind is None:
+        return STATUS_SKIP, f"[?] Пропущен (неподдерживаемый формат): {name}", None
+    prefix, is_video = kind
 
     # Получаем дату
-    date, source = get_media_date(str(file_path), is_video)
+    if media_date is not None:
+        date, source = media_date
+    else:
+        date, source = get_media_date(file_path, is_video, has_ffprobe=has_ffprobe)
 
     if not date:
-        return False, f"[X] Не удалось получить дату: {path_obj.name}", None
+        return STATUS_ERR, f"[X] Не удалось получить дату: {name}", None
+
+    # Файл уже назван по формату по умолчанию с этой же датой: имя не
+    # изменится. Проверка нужна до generate_new_filename, иначе собственное
+    # имя файла считается занятым и файл получил бы суффикс _1
+    if not template_parser and not folder_organizer:
+        is_renamed, renamed_prefix = is_already_renamed(name)
+        if (is_renamed and renamed_prefix == prefix and name.endswith(ext)
+                and get_renamed_name_date(name) == date):
+            return STATUS_SKIP, f"[>] Уже имеет правильное имя: {name}", None
 
     # Генерируем новое имя и определяем целевую папку
     new_name, target_dir = generate_new_filename(
-        prefix, date, ext, str(path_obj.parent),
-        template_parser, folder_organizer
+        prefix, date, ext, parent_dir,
+        template_parser, folder_organizer, name_cache
     )
     
     # Создаём целевую папку если нужно
     if folder_organizer and not dry_run:
-        folder_organizer.create_folder(target_dir, dry_run=False)
+        folder_organizer.create_folder(Path(target_dir), dry_run=False)
 
     # Проверка: если новое имя совпадает со старым И папка та же
-    if new_name == path_obj.name and target_dir == path_obj.parent:
+    if new_name == name and target_dir == parent_dir:
         # В этом случае файл не нуждается в переименовании
-        return False, f"[>] Уже имеет правильное имя: {path_obj.name}", None
+        return STATUS_SKIP, f"[>] Уже имеет правильное имя: {name}", None
 
     # Формируем сообщение
-    if target_dir != path_obj.parent:
+    if target_dir != parent_dir:
         # Файл будет перемещён в другую папку
-        relative_target = target_dir.relative_to(path_obj.parent.parent) if target_dir != path_obj.parent else target_dir.name
-        msg = f"{'[TEST]' if dry_run else '[+]'} {path_obj.name} -> {relative_target}/{new_name} (дата: {source})"
+        relative_target = os.path.relpath(target_dir, os.path.dirname(parent_dir))
+        msg = f"{'[TEST]' if dry_run else '[+]'} {name} -> {relative_target}/{new_name} (дата: {source})"
     else:
-        msg = f"{'[TEST]' if dry_run else '[+]'} {path_obj.name} -> {new_name} (дата: {source})"
+        msg = f"{'[TEST]' if dry_run else '[+]'} {name} -> {new_name} (дата: {source})"
 
     # Выполняем переименование/перемещение
-    new_path = target_dir / new_name
+    new_path = os.path.join(target_dir, new_name)
     
     if not dry_run:
+        # Имя выбрано свободным по кэшу имён; если файл с таким именем всё же
+        # появился (например, создан другой программой), он не будет затёрт
+        try:
+            rename_noreplace(file_path, new_path)
+        except OSError as e:
+            return STATUS_ERR, f"[X] Ошибка переименования {name}: {e}", None
+
+    # Старое имя освобождается (в тестовом режиме — как если бы файл был
+    # переименован, чтобы предпросмотр совпал с реальным запуском)
+    if name_cache is not None:
+        names = name_cache.get(parent_dir)
+        if names is not None:
+            names.discard(_name_key(name))
+
+    return STATUS_OK, msg, (file_path, new_path)
+
+
+def scan_media(root: str) -> Iterator[Tuple[os.DirEntry, Tuple[str, bool], bool]]:
+    """
+    Рекурсивно обойти папку и вернуть поддерживаемые медиафайлы.
+
+    os.scandir отдаёт тип записи вместе со списком папки, поэтому, в отличие
+    от Path.rglob + is_file(), отдельный stat() на каждый файл не нужен.
+    Тип файла и признак переименования определяются здесь же, за один проход;
+    stat() при необходимости берётся у DirEntry, который его кэширует.
+    Символические ссылки на папки не обходятся (как и в Path.rglob),
+    недоступные папки пропускаются.
+
+    Args:
+        root: путь к корневой папке
+
+    Yields:
+        кортеж (os.DirEntry, (префикс, is_video), уже_переименован)
+    """
+    stack = [root]
+    while stack:
+        folder = stack.pop()
         try:
-            os.rename(file_path, new_path)
-        except Exception as e:
-            return False, f"[X] Ошибка переименования {path_obj.name}: {e}", None
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    name = entry.name
+                    kind = classify(name)
+                    if kind and entry.is_file():
+                        yield entry, kind, is_already_renamed(name)[0]
+        except OSError:
+            # Нет доступа к папке или она исчезла во время обхода
+            continue
+
+
+def _flush_output(lines: List[str]) -> None:
+    """Вывести накопленные строки одной записью и очистить список."""
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
+        lines.clear()
 
-    return True, msg, (path_obj, new_path)
+
+def _box_line(text: str, width: int = BOX_WIDTH) -> str:
+    """Строка рамки: текст, дополненный пробелами до ширины рамки."""
+    return "║" + text.ljust(width) + "║"
 
 
 def scan_and_rename(root_folder: str, dry_run: bool = False, files_to_process: Optional[List[Path]] = None,
-                   template: str = None, organize: str = 'none') -> dict:
+                   template: str = None, organize: str = 'none', collect_messages: bool = False,
+                   has_ffprobe: Optional[bool] = None) -> dict:
     """
     Сканировать папку и переименовать все медиафайлы.
 
@@ -429,6 +1091,10 @@ def scan_and_rename(root_folder: str, dry_run: bool = False, files_to_process: O
         files_to_process: список файлов для обработки (если None, обрабатываются все)
         template: пользовательский шаблон имени (опционально)
         organize: структура организации папок ('none', 'year', 'year-month', 'date')
+        collect_messages: если True, сообщения по файлам сохраняются в
+            stats['messages'] (по умолчанию они только печатаются)
+        has_ffprobe: результат check_ffprobe_available() из main (None —
+            проверить при извлечении дат)
 
     Returns:
         словарь со статистикой
@@ -457,48 +1123,48 @@ def scan_and_rename(root_folder: str, dry_run: bool = False, files_to_process: O
         'success': 0,
         'skipped': 0,
         'errors': 0,
-        'messages': []
     }
+    # Список сообщений растёт с числом файлов, поэтому собирается только по запросу
+    messages: Optional[List[str]] = None
+    if collect_messages:
+        messages = stats['messages'] = []
 
-    # Собираем все поддерживаемые расширения
-    supported_exts = PHOTO_EXTENSIONS | VIDEO_EXTENSIONS
+    # Типы файлов, определённые при обходе папки: {путь: (префикс, is_video)}
+    scanned_kinds: Dict[str, Tuple[str, bool]] = {}
 
-    # Если список файлов не передан, собираем все файлы
+    # Если список файлов не передан, собираем все файлы. Найденные файлы
+    # остаются объектами os.DirEntry: как и у Path, у них есть .name и
+    # os.fspath(), но создавать Path для каждого файла не нужно
     if files_to_process is None:
         # Сначала собираем все файлы и проверяем на уже переименованные
         all_files = []
         already_renamed = []
-        
-        for file_path in root.rglob('*'):
-            if file_path.is_file() and file_path.suffix.lower() in supported_exts:
-                is_renamed, _ = is_already_renamed(file_path.name)
-                if is_renamed:
-                    already_renamed.append(file_path)
-                else:
-                    all_files.append(file_path)
+
+        for entry, kind, is_renamed in scan_media(root_folder):
+            scanned_kinds[entry.path] = kind
+            if is_renamed:
+                already_renamed.append(entry)
+            else:
+                all_files.append(entry)
         
         # Если найдены уже переименованные файлы, спрашиваем пользователя
         if already_renamed:
             print()
-            print("╔" + "═" * 68 + "╗")
-            print("║  ⚠️  ВНИМАНИЕ: Обнаружены уже переименованные файлы!" + " " * 13 + "║")
-            print("╠" + "═" * 68 + "╣")
-            print(f"║  Найдено: {len(already_renamed)} файлов соответствуют шаблону Photo/Video-YYYY-..." + " " * (68 - 66 - len(str(len(already_renamed)))) + "║")
-            print("║" + " " * 68 + "║")
-            print("║  Примеры:" + " " * 58 + "║")
-            
+            print("╔" + "═" * BOX_WIDTH + "╗")
+            print(_box_line("  ⚠️  ВНИМАНИЕ: Обнаружены уже переименованные файлы!"))
+            print("╠" + "═" * BOX_WIDTH + "╣")
+            print(_box_line(f"  Найдено: {len(already_renamed)} файлов соответствуют шаблону Photo/Video-YYYY-..."))
+            print(_box_line(""))
+            print(_box_line("  Примеры:"))
+
             # Показываем до 5 примеров
-            for i, file_path in enumerate(already_renamed[:5]):
-                filename = file_path.name
-                spaces = 68 - 7 - len(filename)
-                print(f"║    • {filename}" + " " * spaces + "║")
-            
+            for entry in already_renamed[:5]:
+                print(_box_line(f"    • {entry.name}"))
+
             if len(already_renamed) > 5:
-                remaining = len(already_renamed) - 5
-                spaces = 68 - 11 - len(str(remaining))
-                print(f"║    ... и ещё {remaining}" + " " * spaces + "║")
-            
-            print("╚" + "═" * 68 + "╝")
+                print(_box_line(f"    ... и ещё {len(already_renamed) - 5}"))
+
+            print("╚" + "═" * BOX_WIDTH + "╝")
             print()
             print("[?] Что делать с этими файлами?")
             print("    [1] Пропустить (обработать только новые файлы)")
@@ -531,32 +1197,73 @@ def scan_and_rename(root_folder: str, dry_run: bool = False, files_to_process: O
             # Нет уже переименованных файлов
             files_to_process = all_files
 
-    # Обрабатываем файлы
+    # Предварительный проход: даты всех файлов извлекаются параллельно
+    media_files = []
+    # stat файлов, найденных обходом папки: DirEntry кэширует его (в Windows
+    # он вообще приходит вместе со списком папки), повторный os.stat не нужен
+    file_stats: Dict[str, os.stat_result] = {}
+    for file_path in files_to_process:
+        path = os.fspath(file_path)
+        kind = scanned_kinds.get(path) or classify(file_path.name)
+        if kind:
+            media_files.append((path, kind[1]))
+            if isinstance(file_path, os.DirEntry):
+                try:
+                    file_stats[path] = file_path.stat()
+                except OSError:
+                    pass
+    date_cache = MediaDateCache(root)
+    media_dates = extract_media_dates(media_files, date_cache, file_stats, has_ffprobe)
+
+    # Обрабатываем файлы. Медленная часть (EXIF, ffprobe) уже выполнена
+    # в пуле потоков; цикл намеренно последовательный: суффиксы _1, _2 для
+    # снимков с одинаковой датой и порядок вывода не должны зависеть от
+    # того, какой поток успел первым, а переименования в одной папке
+    # файловая система всё равно выполняет по очереди
     changes_for_history = []
-    
+    # Имена в папках назначения: одно чтение папки вместо stat() на каждый файл
+    name_cache: Dict[str, Set[str]] = {}
+    # Строки результата выводятся пачками по OUTPUT_BATCH_SIZE
+    output: List[str] = []
+
     for file_path in files_to_process:
         stats['total'] += 1
 
-        success, message, paths = process_file(str(file_path), dry_run, template_parser, folder_organizer)
-
-        if success:
-            stats['success'] += 1
+        path = os.fspath(file_path)
+        try:
+            status, message, paths = process_file(path, dry_run, template_parser,
+                                                   folder_organizer, media_dates.get(path), name_cache,
+                                                   has_ffprobe)
+        except OSError as e:
+            # Ошибка одного файла (например, нет прав на папку назначения)
+            # не прерывает цикл: уже выполненные переименования попадут в историю
+            status, message, paths = STATUS_ERR, f"[X] Ошибка обработки {os.path.basename(path)}: {e}", None
+
+        stats[STATUS_STATS_KEYS[status]] += 1
+        if status == STATUS_OK:
             if not dry_run and paths:
+                old_abs, new_abs = paths
+                # Дата переименованного файла остаётся в кэше под новым именем
+                date_cache.move(old_abs, new_abs)
                 try:
-                    old_abs, new_abs = paths
-                    old_rel = old_abs.relative_to(root)
-                    new_rel = new_abs.relative_to(root)
-                    changes_for_history.append({"old": str(old_rel), "new": str(new_rel)})
+                    old_rel = os.path.relpath(old_abs, root_folder)
+                    new_rel = os.path.relpath(new_abs, root_folder)
+                    changes_for_history.append({"old": old_rel, "new": new_rel})
                 except ValueError:
-                    # Если пути не относительны корню (редкий кейс, но возможен)
+                    # Пути на другом диске, чем корень (Windows): относительного пути нет
                     pass
-        elif 'Пропущен' in message or 'Уже переименован' in message:
-            stats['skipped'] += 1
-        else:
-            stats['errors'] += 1
 
-        stats['messages'].append(message)
-        print(message)
+        if messages is not None:
+            messages.append(message)
+        output.append(message)
+        if len(output) >= OUTPUT_BATCH_SIZE:
+            _flush_output(output)
+
+    _flush_output(output)
+    # Тестовый режим ничего не записывает в папку: кэш используется только
+    # для чтения, найденные даты остаются в памяти до конца запуска
+    if not dry_run:
+        date_cache.save()
 
     # Сохраняем историю
     if not dry_run and changes_for_history:
@@ -613,10 +1320,10 @@ def print_help():
     print("  date        По датам (2023-08-15/, 2024-01-10/)")
     print()
     print(f"Поддерживаемые форматы фото ({len(PHOTO_EXTENSIONS)}):")
-    print(f"  {', '.join(sorted(PHOTO_EXTENSIONS))}")
+    print(f"  {', '.join(_SORTED_PHOTO)}")
     print()
     print(f"Поддерживаемые форматы видео ({len(VIDEO_EXTENSIONS)}):")
-    print(f"  {', '.join(sorted(VIDEO_EXTENSIONS))}")
+    print(f"  {', '.join(_SORTED_VIDEO)}")
     print()
 
 
@@ -751,7 +1458,8 @@ def main():
     print("-" * 70)
 
     try:
-        stats = scan_and_rename(folder, dry_run, template=template, organize=organize)
+        stats = scan_and_rename(folder, dry_run, template=template, organize=organize,
+                                has_ffprobe=has_ffprobe)
 
         # Выводим статистику
         print("-" * 70)
@@ -13,6 +13,9 @@
 import os
 import sys
 import re
+import functools
+import struct
+import importlib.util
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 from datetime import datetime
@@ -21,7 +24,8 @@ import subprocess
 import json
 import threading
 import queue
-from typing import Optional, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, List, Dict, Iterator, Container
 
 # Импорт новых модулей для v1.3
 try:
@@ -35,43 +39,115 @@ except ImportError:
     from folder_organizer import FolderOrganizer
     from history_manager import HistoryManager
 
-try:
-    from PIL import Image
-    from PIL.ExifTags import TAGS
-except ImportError:
+# Pillow загружается лениво, как и в CLI версии: окно открывается
+# без импорта плагинов изображений. Здесь только проверка наличия
+Image = None
+
+if importlib.util.find_spec("PIL") is None:
     print("❌ Ошибка: не установлена библиотека Pillow")
     print("Установите её командой: pip install Pillow")
     sys.exit(1)
 
+
+def _load_pil():
+    """Импортировать PIL.Image при первом вызове и вернуть модуль."""
+    global Image
+    if Image is None:
+        from PIL import Image as _Image
+        Image = _Image
+    return Image
+
+
 # =============================================================================
 # КОНФИГУРАЦИЯ (аналогична CLI версии)
 # =============================================================================
 
-PHOTO_EXTENSIONS = {
+PHOTO_EXTENSIONS = frozenset({
     '.jpg', '.jpeg', '.jpe', '.jfif', '.png', '.gif', '.bmp', '.dib',
     '.tif', '.tiff', '.webp', '.heic', '.heif', '.raw', '.cr2', '.nef',
     '.arw', '.dng', '.orf', '.rw2', '.psd', '.ico', '.pcx', '.tga'
-}
+})
 
-VIDEO_EXTENSIONS = {
+VIDEO_EXTENSIONS = frozenset({
     '.mp4', '.m4v', '.m4p', '.mov', '.qt', '.avi', '.wmv', '.asf',
     '.flv', '.f4v', '.mkv', '.webm', '.mpg', '.mpeg', '.mpe',
     '.3gp', '.3g2', '.vob', '.ogv', '.mts', '.m2ts', '.ts'
-}
+})
+
+# Все поддерживаемые расширения: объединение считается один раз при импорте
+SUPPORTED_EXTENSIONS = PHOTO_EXTENSIONS | VIDEO_EXTENSIONS
+
+# Расширение -> (префикс имени, is_video): один поиск в словаре
+EXT_KIND = {ext: ("Photo", False) for ext in PHOTO_EXTENSIONS}
+EXT_KIND.update({ext: ("Video", True) for ext in VIDEO_EXTENSIONS})
+
+# Расширение -> значок в списках файлов
+EXT_TO_ICON = {ext: "📷" for ext in PHOTO_EXTENSIONS}
+EXT_TO_ICON.update({ext: "🎬" for ext in VIDEO_EXTENSIONS})
+# Готовое начало строки списка ("📷 "): строка файла — одна конкатенация
+EXT_TO_ROW_PREFIX = {ext: icon + " " for ext, icon in EXT_TO_ICON.items()}
 
 DATE_FORMAT = "%Y-%m-%d_%H%M%S"
 
+# Результат обработки файла (process_file) и соответствующий ключ статистики
+STATUS_OK, STATUS_SKIP, STATUS_ERR = 0, 1, 2
+STATUS_STATS_KEYS = ('success', 'skipped', 'errors')
+
+# Потоки для извлечения дат: чтение файлов и ожидание ffprobe
+METADATA_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Быстрое чтение EXIF из JPEG (сегмент APP1) без Pillow
+JPEG_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.jpe', '.jfif'})
+JPEG_HEADER_SIZE = 65536
+EXIF_IFD_POINTER = 0x8769
+# DateTimeOriginal (Exif IFD), DateTime (IFD0), DateTimeDigitized (Exif IFD)
+EXIF_DATE_TAGS = (0x9003, 0x0132, 0x9004)
+# Теги из этого набора лежат в IFD0, остальные — в Exif IFD
+IFD0_DATE_TAGS = frozenset({0x0132})
+
 # Регулярное выражение для проверки уже переименованных файлов
 # Формат: Photo-YYYY-MM-DD_HHMMSS[_N].ext или Video-YYYY-MM-DD_HHMMSS[_N].ext
+# Применяется через fullmatch (якоря ^ и $ не нужны); re.ASCII: только ASCII-цифры.
+# Захватывается только префикс: дата GUI не нужна, а лишние группы
+# пришлось бы заполнять при каждом совпадении
 RENAMED_PATTERN = re.compile(
-    r'^(Photo|Video)-(\d{4})-(\d{2})-(\d{2})_(\d{6})(_\d+)?\.\w+$',
-    re.IGNORECASE
+    r'(Photo|Video)-\d{4}-\d{2}-\d{2}_\d{6}(?:_\d+)?\.\w+',
+    re.IGNORECASE | re.ASCII
 )
+# is_already_renamed проверяет тот же формат по частям: префикс (первые
+# RENAMED_PREFIX_LENGTH символов) — поиском в множестве, остаток — выражением
+# без альтернативы и групп, с позиции после префикса (без среза строки).
+# Связанный метод fullmatch: без поиска атрибута на каждый вызов
+RENAMED_PREFIX_LENGTH = 5
+RENAMED_PREFIX_KEYS = frozenset({'photo', 'video'})
+_RENAMED_TAIL_FULLMATCH = re.compile(
+    r'-\d{4}-\d{2}-\d{2}_\d{6}(?:_\d+)?\.\w+',
+    re.ASCII
+).fullmatch
+# Длина самого короткого подходящего имени ("Photo-YYYY-MM-DD_HHMMSS.x"):
+# более короткие имена отсекаются без регулярного выражения
+RENAMED_MIN_LENGTH = len("Photo-2023-08-15_142203.x")
+# Первые символы таких имён: большинство имён (IMG_, DSC, 2024...) отсекаются
+# по одному символу, без создания строки в нижнем регистре
+RENAMED_FIRST_CHARS = frozenset('PpVv')
 
 # =============================================================================
 # ФУНКЦИИ ДЛЯ ПРОВЕРКИ УЖЕ ПЕРЕИМЕНОВАННЫХ ФАЙЛОВ
 # =============================================================================
 
+@functools.lru_cache(maxsize=8192)
+def _matches_renamed_format(filename: str) -> bool:
+    """
+    Проверить имя-кандидат (прошедшее предпроверку) на полный формат.
+
+    Результат кэшируется: тестовый прогон и следующий за ним реальный
+    проверяют те же имена. Кэшируются только кандидаты — остальные имена
+    отсекаются предпроверкой быстрее, чем работает поиск в кэше.
+    """
+    return (filename[:RENAMED_PREFIX_LENGTH].lower() in RENAMED_PREFIX_KEYS
+            and _RENAMED_TAIL_FULLMATCH(filename, RENAMED_PREFIX_LENGTH) is not None)
+
+
 def is_already_renamed(filename: str) -> Tuple[bool, str]:
     """
     Проверить, соответствует ли имя файла шаблону переименования.
@@ -89,38 +165,148 @@ def is_already_renamed(filename: str) -> Tuple[bool, str]:
         >>> is_already_renamed("IMG_20230815.jpg")
         (False, "")
     """
-    match = RENAMED_PATTERN.match(filename)
-    if match:
-        prefix = match.group(1)  # "Photo" или "Video"
-        return True, prefix
+    # Предпроверка по первому символу и длине, затем полная проверка fullmatch на C
+    if filename[:1] not in RENAMED_FIRST_CHARS or len(filename) < RENAMED_MIN_LENGTH:
+        return False, ""
+
+    if _matches_renamed_format(filename):
+        return True, filename[:RENAMED_PREFIX_LENGTH]  # "Photo" или "Video" в исходном регистре
     return False, ""
 
 # =============================================================================
 # ФУНКЦИИ ДЛЯ ИЗВЛЕЧЕНИЯ МЕТАДАННЫХ (копия из CLI версии)
 # =============================================================================
 
+def _fast_exif_dt(date_str: str) -> Optional[datetime]:
+    """Быстро разобрать дату фиксированного формата без strptime (см. CLI)."""
+    try:
+        if len(date_str) < 19:
+            return None
+        date_str = date_str[:19]
+        if date_str[4] == ':':
+            date_str = date_str.replace(':', '-', 2)
+        return datetime.fromisoformat(date_str)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_exif_dt(date_str: str) -> Optional[datetime]:
+    """Разобрать строку даты из EXIF ("2023:08:15 14:22:03")."""
+    date = _fast_exif_dt(date_str)
+    if date:
+        return date
+    try:
+        return datetime.strptime(date_str[:19], '%Y:%m:%d %H:%M:%S')
+    except (ValueError, TypeError):
+        try:
+            return datetime.strptime(date_str[:19], '%Y-%m-%d %H:%M:%S')
+        except (ValueError, TypeError):
+            return None
+
+
+def _read_ifd_entries(tiff: bytes, offset: int, byte_order: str,
+                      wanted: Tuple[int, ...]) -> Dict[int, Tuple[int, int, int]]:
+    """Прочитать нужные записи IFD: {ID тега: (тип, количество, значение)}."""
+    found = {}
+    if offset + 2 > len(tiff):
+        return found
+
+    (count,) = struct.unpack_from(byte_order + 'H', tiff, offset)
+    entry = offset + 2
+    end = min(entry + count * 12, len(tiff) - 11)
+
+    while entry < end:
+        tag, value_type, value_count, value = struct.unpack_from(byte_order + 'HHII', tiff, entry)
+        if tag in wanted:
+            found[tag] = (value_type, value_count, value)
+        entry += 12
+
+    return found
+
+
+def _jpeg_exif_dt(file_path: str) -> Optional[datetime]:
+    """Извлечь дату съёмки из JPEG, разобрав сегмент APP1 напрямую (см. CLI)."""
+    try:
+        with open(file_path, 'rb') as f:
+            head = f.read(JPEG_HEADER_SIZE)
+    except OSError:
+        return None
+
+    if head[:2] != b'\xff\xd8':
+        return None
+
+    pos = 2
+    tiff = None
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in (0xDA, 0xD9):
+            return None
+        (length,) = struct.unpack_from('>H', head, pos + 2)
+        if marker == 0xE1 and head[pos + 4:pos + 10] == b'Exif\x00\x00':
+            tiff = head[pos + 10:pos + 2 + length]
+            break
+        pos += 2 + length
+
+    if not tiff or len(tiff) < 8 or tiff[:2] not in (b'II', b'MM'):
+        return None
+    byte_order = '<' if tiff[:2] == b'II' else '>'
+
+    try:
+        (ifd0_offset,) = struct.unpack_from(byte_order + 'I', tiff, 4)
+        tags = _read_ifd_entries(tiff, ifd0_offset, byte_order, (0x0132, EXIF_IFD_POINTER))
+        if EXIF_IFD_POINTER in tags:
+            tags.update(_read_ifd_entries(tiff, tags[EXIF_IFD_POINTER][2], byte_order,
+                                          (0x9003, 0x9004)))
+    except struct.error:
+        return None
+
+    for tag_id in EXIF_DATE_TAGS:
+        if tag_id not in tags:
+            continue
+        value_type, value_count, value_offset = tags[tag_id]
+        if value_type != 2 or value_count <= 4:
+            continue
+        raw = tiff[value_offset:value_offset + value_count]
+        date = _parse_exif_dt(raw.rstrip(b'\x00').decode('latin-1'))
+        if date:
+            return date
+
+    return None
+
+
 def get_photo_creation_date(file_path: str) -> Optional[datetime]:
     """Извлечь дату создания фото из EXIF метаданных."""
+    # JPEG: читаем только заголовок файла, без Pillow
+    if os.path.splitext(file_path)[1].lower() in JPEG_EXTENSIONS:
+        date = _jpeg_exif_dt(file_path)
+        if date:
+            return date
+
     try:
-        with Image.open(file_path) as image:
-            exifdata = image._getexif()
-            if not exifdata:
+        # getexif() разбирает теги лениво: ищем только нужные по их ID
+        with _load_pil().open(file_path) as image:
+            exif = image.getexif()
+            if not exif:
                 return None
 
-            priority_tags = ['DateTimeOriginal', 'DateTime', 'CreateDate']
-            exif_dict = {TAGS.get(tag_id, tag_id): value
-                        for tag_id, value in exifdata.items()}
-
-            for tag_name in priority_tags:
-                if tag_name in exif_dict:
-                    date_str = exif_dict[tag_name]
-                    try:
-                        return datetime.strptime(date_str[:19], '%Y:%m:%d %H:%M:%S')
-                    except (ValueError, TypeError):
-                        try:
-                            return datetime.strptime(date_str[:19], '%Y-%m-%d %H:%M:%S')
-                        except (ValueError, TypeError):
-                            continue
+            exif_ifd = None
+            for tag_id in EXIF_DATE_TAGS:
+                if tag_id in IFD0_DATE_TAGS:
+                    date_str = exif.get(tag_id)
+                else:
+                    if exif_ifd is None:
+                        exif_ifd = exif.get_ifd(EXIF_IFD_POINTER)
+                    date_str = exif_ifd.get(tag_id)
+
+                if date_str:
+                    date = _parse_exif_dt(date_str)
+                    if date:
+                        return date
     except Exception:
         pass
     return None
@@ -173,6 +359,40 @@ def get_media_date(file_path: str, is_video: bool) -> Tuple[Optional[datetime],
     return date, "file_system"
 
 
+def _file_media_date(file_path: str) -> Optional[Tuple[Optional[datetime], str]]:
+    """Дата файла для пула потоков; None для неподдерживаемого формата или ошибки."""
+    kind = EXT_KIND.get(os.path.splitext(file_path)[1].lower())
+    if kind is None:
+        return None
+    try:
+        return get_media_date(file_path, kind[1])
+    except OSError:
+        # Файл исчез или недоступен: process_file сообщит об ошибке сам
+        return None
+
+
+def extract_media_dates(file_paths: List[str]) -> Dict[str, Tuple[Optional[datetime], str]]:
+    """
+    Извлечь даты набора файлов параллельно (как в CLI версии).
+
+    Чтение EXIF и ожидание ffprobe не зависят друг от друга и отпускают GIL;
+    переименование остаётся последовательным, чтобы суффиксы _1, _2 не
+    зависели от порядка завершения потоков.
+    """
+    with ThreadPoolExecutor(max_workers=METADATA_WORKERS) as pool:
+        return {
+            path: date
+            for path, date in zip(file_paths, pool.map(_file_media_date, file_paths))
+            if date is not None
+        }
+
+
+def fmt_dt(date: datetime) -> str:
+    """Отформатировать дату для имени файла (DATE_FORMAT) без strftime."""
+    return (f"{date.year:04d}-{date.month:02d}-{date.day:02d}_"
+            f"{date.hour:02d}{date.minute:02d}{date.second:02d}")
+
+
 def generate_new_filename(prefix: str, date: datetime, extension: str,
                          base_dir: str, template_parser: Optional[TemplateParser] = None) -> str:
     """Сгенерировать новое имя файла, избегая дубликатов."""
@@ -182,7 +402,7 @@ def generate_new_filename(prefix: str, date: datetime, extension: str,
         name_body = template_parser.format(date, prefix)
         new_name = f"{name_body}{extension}"
     else:
-        date_str = date.strftime(DATE_FORMAT)
+        date_str = fmt_dt(date)
         new_name = f"{prefix}-{date_str}{extension}"
     
     new_path = os.path.join(base_dir, new_name)
@@ -203,38 +423,44 @@ def generate_new_filename(prefix: str, date: datetime, extension: str,
 
 def process_file(file_path: str, dry_run: bool = False,
                  template_parser: Optional[TemplateParser] = None,
-                 folder_organizer: Optional[FolderOrganizer] = None) -> Tuple[bool, str, Optional[Tuple[Path, Path]]]:
-    """Обработать один файл: определить дату и переименовать."""
+                 folder_organizer: Optional[FolderOrganizer] = None,
+                 media_date: Optional[Tuple[Optional[datetime], str]] = None
+                 ) -> Tuple[int, str, Optional[Tuple[Path, Path]]]:
+    """
+    Обработать один файл: определить дату (или взять media_date) и переименовать.
+
+    Returns:
+        (статус STATUS_OK/STATUS_SKIP/STATUS_ERR, сообщение, (старый_путь, новый_путь) или None)
+    """
     path_obj = Path(file_path)
     ext = path_obj.suffix.lower()
 
-    if ext in PHOTO_EXTENSIONS:
-        prefix = "Photo"
-        is_video = False
-    elif ext in VIDEO_EXTENSIONS:
-        prefix = "Video"
-        is_video = True
-    else:
-        return False, f"❓ Пропущен: {path_obj.name}", None
+    kind = EXT_KIND.get(ext)
+    if kind is None:
+        return STATUS_SKIP, f"❓ Пропущен: {path_obj.name}", None
+    prefix, is_video = kind
 
-    date, source = get_media_date(str(file_path), is_video)
+    if media_date is not None:
+        date, source = media_date
+    else:
+        date, source = get_media_date(str(file_path), is_video)
 
     if not date:
-        return False, f"❌ Не удалось получить дату: {path_obj.name}", None
+        return STATUS_ERR, f"❌ Не удалось получить дату: {path_obj.name}", None
 
     # Если включена организация по папкам, целевая папка меняется
     target_dir = path_obj.parent
     if folder_organizer:
         target_dir = folder_organizer.get_folder_path(Path(file_path).parent, date)
-        if not dry_run and not target_dir.exists():
-            target_dir.mkdir(parents=True, exist_ok=True)
+        if not dry_run:
+            folder_organizer.create_folder(target_dir)
 
     new_name = generate_new_filename(prefix, date, ext, str(target_dir), template_parser)
     new_path = target_dir / new_name
 
     # Проверка: если путь не изменился
     if new_path == path_obj:
-        return False, f"⏩ Уже имеет правильное имя и место: {path_obj.name}", None
+        return STATUS_SKIP, f"⏩ Уже имеет правильное имя и место: {path_obj.name}", None
 
     msg = f"{'[ТЕСТ]' if dry_run else '✅'} {path_obj.name} → {new_name}"
     if folder_organizer and target_dir != path_obj.parent:
@@ -248,9 +474,45 @@ def process_file(file_path: str, dry_run: bool = False,
         try:
             os.rename(file_path, new_path)
         except Exception as e:
-            return False, f"❌ Ошибка: {path_obj.name}: {e}", None
+            return STATUS_ERR, f"❌ Ошибка: {path_obj.name}: {e}", None
+
+    return STATUS_OK, msg, (path_obj, new_path)
+
+
+def _iter_media(root: str, exts: Container[str]) -> Iterator[str]:
+    """
+    Рекурсивно обойти папку и вернуть пути файлов с подходящим расширением.
+
+    Как и scan_media в CLI версии: os.scandir отдаёт тип записи вместе со
+    списком папки, и расширение проверяется по имени, поэтому stat() и
+    объект Path на каждый файл не нужны. Ссылки на папки не обходятся,
+    недоступные папки пропускаются.
+
+    Args:
+        root: путь к корневой папке
+        exts: допустимые расширения (в нижнем регистре, с точкой)
 
-    return True, msg, (path_obj, new_path)
+    Yields:
+        полный путь к файлу
+    """
+    stack = [root]
+    while stack:
+        folder = stack.pop()
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                        continue
+                    name = entry.name
+                    # rfind > 0: у скрытых файлов вида ".jpg" расширения нет,
+                    # как и у Path.suffix
+                    dot = name.rfind('.')
+                    if dot > 0 and name[dot:].lower() in exts and entry.is_file():
+                        yield entry.path
+        except OSError:
+            # Нет доступа к папке или она исчезла во время обхода
+            continue
 
 
 # =============================================================================
@@ -262,6 +524,10 @@ class RenamedFilesDialog(tk.Toplevel):
     Модальный диалог для отображения уже переименованных файлов
     и запроса действия у пользователя.
     """
+
+    # Сколько строк списка добавлять за раз: следующая порция
+    # подгружается, когда список прокручен до конца
+    LIST_PAGE_SIZE = 100
     
     def __init__(self, parent: tk.Tk, renamed_files: List[Path], to_rename_count: int):
         """
@@ -348,24 +614,22 @@ class RenamedFilesDialog(tk.Toplevel):
         scrollbar = tk.Scrollbar(list_container)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        self.list_scrollbar = scrollbar
         self.file_listbox = tk.Listbox(
             list_container,
             font=("Consolas", 9),
-            yscrollcommand=scrollbar.set,
+            yscrollcommand=self.on_list_scroll,
             height=12
         )
         self.file_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.file_listbox.yview)
         
-        # Заполняем список (максимум 100 файлов)
-        for file_path in self.renamed_files[:100]:
-            # Определяем иконку
-            ext = file_path.suffix.lower()
-            icon = "📷" if ext in PHOTO_EXTENSIONS else "🎬"
-            self.file_listbox.insert(tk.END, f"{icon} {file_path.name}")
-        
-        if len(self.renamed_files) > 100:
-            self.file_listbox.insert(tk.END, f"... и ещё {len(self.renamed_files) - 100} файлов")
+        # Заполняем список первой порцией; остальные файлы добавляются
+        # при прокрутке (см. on_list_scroll), поэтому окно открывается
+        # одинаково быстро при любом числе файлов, и видны все файлы
+        self.shown_count = 0
+        self.loading_more = False
+        self.load_more_files()
         
         # Вопрос
         question_frame = tk.Frame(self, pady=10)
@@ -423,6 +687,42 @@ class RenamedFilesDialog(tk.Toplevel):
         # Обработка закрытия окна
         self.protocol("WM_DELETE_WINDOW", self.on_cancel)
         
+    def load_more_files(self):
+        """Добавить в список следующую порцию файлов."""
+        self.loading_more = False
+        # Вызов из after_idle мог прийти уже после закрытия окна
+        if not self.winfo_exists():
+            return
+        total = len(self.renamed_files)
+        start = self.shown_count
+        end = min(start + self.LIST_PAGE_SIZE, total)
+
+        # Строка "... и ещё N" всегда последняя: убираем её перед добавлением
+        if start:
+            self.file_listbox.delete(tk.END)
+
+        # Строки вставляются одним вызовом insert: каждый вызов —
+        # отдельное обращение к Tcl
+        prefixes = EXT_TO_ROW_PREFIX
+        items = [
+            prefixes.get(file_path.suffix.lower(), "📄 ") + file_path.name
+            for file_path in self.renamed_files[start:end]
+        ]
+        if end < total:
+            items.append(f"... и ещё {total - end} файлов (прокрутите вниз)")
+        if items:
+            self.file_listbox.insert(tk.END, *items)
+        self.shown_count = end
+
+    def on_list_scroll(self, first: str, last: str):
+        """Обновить полосу прокрутки и подгрузить файлы у конца списка."""
+        self.list_scrollbar.set(first, last)
+        if (float(last) >= 1.0 and self.shown_count < len(self.renamed_files)
+                and not self.loading_more):
+            # Список нельзя менять внутри его собственного yscrollcommand
+            self.loading_more = True
+            self.after_idle(self.load_more_files)
+
     def on_skip(self):
         """Пропустить уже переименованные файлы."""
         self.result = "skip"
@@ -451,6 +751,15 @@ class RenamedFilesDialog(tk.Toplevel):
 class RenameMediaApp:
     """Главное окно приложения."""
 
+    # Все изменения окна из потока обработки идут через очередь ui_queue,
+    # которую раз в LOG_POLL_MS мс разбирает главный поток (не более
+    # LOG_BATCH_SIZE сообщений за раз); строки лога выводятся пачками
+    LOG_POLL_MS = 50
+    LOG_BATCH_SIZE = 500
+    # Снимок статистики передаётся раз в STATS_UPDATE_EVERY файлов
+    # (степень двойки: проверка сводится к битовой маске)
+    STATS_UPDATE_EVERY = 64
+
     def __init__(self, root):
         self.root = root
         self.root.title("Переименование фото и видео")
@@ -478,8 +787,14 @@ class RenameMediaApp:
         self.user_choice = None
         self.choice_queue = queue.Queue()
 
+        # Сообщения для окна: ("log", текст), ("stats", словарь) или
+        # ("call", (функция, аргументы)). Tk не потокобезопасен, поэтому
+        # виджеты меняются только в главном потоке (см. pump_ui_queue)
+        self.ui_queue = queue.Queue()
+
         # Создаём интерфейс
         self.create_widgets()
+        self.root.after(self.LOG_POLL_MS, self.pump_ui_queue)
 
         # Центрируем окно
         self.center_window()
@@ -791,13 +1106,64 @@ class RenameMediaApp:
             self.refresh_history_manager()
 
     def log_message(self, message: str):
-        """Добавить сообщение в лог."""
-        self.output_area.insert(tk.END, message + "\n")
-        self.output_area.see(tk.END)
-        self.root.update_idletasks()
+        """
+        Добавить сообщение в лог.
+
+        Можно вызывать из любого потока: сообщение ставится в очередь,
+        в окно его выводит pump_ui_queue.
+        """
+        self.ui_queue.put(("log", message))
+
+    def run_in_ui(self, func, *args):
+        """Выполнить func(*args) в главном потоке после уже поставленных сообщений."""
+        self.ui_queue.put(("call", (func, args)))
+
+    def pump_ui_queue(self):
+        """Разобрать очередь сообщений для окна (главный поток, по таймеру)."""
+        lines = []
+        stats = None
+        count = 0
+
+        def flush_lines():
+            if lines:
+                # Одна вставка и одна прокрутка на пачку вместо перерисовки на строку
+                self.output_area.insert(tk.END, "\n".join(lines) + "\n")
+                self.output_area.see(tk.END)
+                lines.clear()
+
+        try:
+            while count < self.LOG_BATCH_SIZE:
+                kind, payload = self.ui_queue.get_nowait()
+                count += 1
+                if kind == "log":
+                    lines.append(payload)
+                elif kind == "stats":
+                    # Промежуточные снимки, не успевшие попасть на экран, не нужны
+                    stats = payload
+                else:
+                    # Лог до вызова выводится раньше него. Вызов планируется
+                    # через after, а не выполняется здесь: модальные окна
+                    # (диалог, messagebox) не должны останавливать разбор очереди
+                    flush_lines()
+                    func, args = payload
+                    self.root.after(0, func, *args)
+        except queue.Empty:
+            pass
+
+        flush_lines()
+        if stats is not None:
+            self.show_stats(stats)
+
+        # Если очередь не разобрана до конца, продолжаем без паузы
+        delay = 1 if count == self.LOG_BATCH_SIZE else self.LOG_POLL_MS
+        self.root.after(delay, self.pump_ui_queue)
 
     def update_stats(self, stats: dict):
-        """Обновить статистику."""
+        """Обновить статистику (из любого потока, через очередь)."""
+        self.ui_queue.put(("stats", dict(stats)))
+
+    def show_stats(self, stats: dict):
+        """Показать статистику в окне."""
         text = (
             f"Обработано: {stats['total']} | "
             f"✅ Успешно: {stats['success']} | "
@@ -873,13 +1239,6 @@ class RenameMediaApp:
     def process_files_thread(self):
         """Обработка файлов в отдельном потоке."""
         try:
-            stats = {
-                'total': 0,
-                'success': 0,
-                'skipped': 0,
-                'errors': 0
-            }
-
             # Инициализация инструментов v1.3
             template_parser = TemplateParser(self.template_str.get())
             folder_organizer = FolderOrganizer('year-month') if self.organize_folders.get() else None
@@ -890,25 +1249,24 @@ class RenameMediaApp:
             self.log_message(f"📝 Используемый шаблон: {self.template_str.get()}\n")
 
             root = Path(self.folder_path)
-            supported_exts = PHOTO_EXTENSIONS | VIDEO_EXTENSIONS
 
-            # Сначала собираем все файлы и разделяем на уже переименованные и новые
-            all_files = [
-                f for f in root.rglob('*')
-                if f.is_file() and f.suffix.lower() in supported_exts
-            ]
-            
+            # Собираем файлы и за тот же проход разделяем на уже
+            # переименованные и новые, без промежуточного списка всех файлов
             already_renamed = []
             to_rename = []
-            
-            for file_path in all_files:
-                is_renamed, _ = is_already_renamed(file_path.name)
-                if is_renamed:
-                    already_renamed.append(file_path)
+            add_renamed = already_renamed.append
+            add_new = to_rename.append
+            check_renamed = is_already_renamed
+
+            for path in _iter_media(self.folder_path, SUPPORTED_EXTENSIONS):
+                file_path = Path(path)
+                if check_renamed(file_path.name)[0]:
+                    add_renamed(file_path)
                 else:
-                    to_rename.append(file_path)
-            
-            self.log_message(f"📊 Найдено файлов: {len(all_files)}")
+                    add_new(file_path)
+            total_found = len(already_renamed) + len(to_rename)
+
+            self.log_message(f"📊 Найдено файлов: {total_found}")
             self.log_message(f"   • Уже переименованных: {len(already_renamed)}")
             self.log_message(f"   • Требуют переименования: {len(to_rename)}\n")
             
@@ -919,7 +1277,7 @@ class RenameMediaApp:
                 self.log_message("⚠️ Обнаружены уже переименованные файлы. Ожидание выбора пользователя...\n")
                 
                 # Показываем диалог в главном потоке
-                self.root.after(0, lambda: self.show_renamed_dialog(already_renamed, len(to_rename)))
+                self.run_in_ui(self.show_renamed_dialog, already_renamed, len(to_rename))
                 
                 # Ожидаем ответ пользователя
                 user_choice = self.choice_queue.get()
@@ -933,27 +1291,46 @@ class RenameMediaApp:
                     files_to_process = to_rename
                 elif user_choice == "rerename":
                     self.log_message(f"🔄 Переименовываем заново все файлы\n")
-                    self.log_message(f"📊 Будет обработано: {len(all_files)} файлов\n")
-                    files_to_process = all_files
+                    self.log_message(f"📊 Будет обработано: {total_found} файлов\n")
+                    files_to_process = to_rename + already_renamed
             
             self.log_message("-" * 80 + "\n")
 
+            # Даты всех файлов извлекаются параллельно, переименование
+            # затем идёт по порядку
+            file_paths = [str(file_path) for file_path in files_to_process]
+            media_dates = extract_media_dates(file_paths)
+
             # Обрабатываем файлы
             changes_for_history = []
             
-            for file_path in files_to_process:
-                stats['total'] += 1
-
-                success, message, paths = process_file(
-                    str(file_path), 
-                    self.dry_run.get(),
+            # Счётчики цикла — локальные переменные (число файлов и список
+            # по индексу STATUS_*); словарь собирается только для окна
+            total = 0
+            counts = [0, 0, 0]
+            # Переменная Tk читается один раз, а не дважды на каждый файл
+            dry_run = self.dry_run.get()
+
+            def stats_snapshot() -> dict:
+                snapshot = {'total': total}
+                for key, count in zip(STATUS_STATS_KEYS, counts):
+                    snapshot[key] = count
+                return snapshot
+
+            for file_path in file_paths:
+                total += 1
+
+                status, message, paths = process_file(
+                    file_path,
+                    dry_run,
                     template_parser,
-                    folder_organizer
+                    folder_organizer,
+                    media_dates.get(file_path)
                 )
 
-                if success:
-                    stats['success'] += 1
-                    if not self.dry_run.get() and paths:
+                counts[status] += 1
+                if status == STATUS_OK:
+                    if not dry_run and paths:
                         try:
                             old_abs, new_abs = paths
                             old_rel = old_abs.relative_to(root)
@@ -961,13 +1338,14 @@ class RenameMediaApp:
                             changes_for_history.append({"old": str(old_rel), "new": str(new_rel)})
                         except ValueError:
                             pass
-                elif 'Пропущен' in message or 'Уже переименован' in message:
-                    stats['skipped'] += 1
-                else:
-                    stats['errors'] += 1
 
                 self.log_message(message)
-                self.update_stats(stats)
+                if total & (self.STATS_UPDATE_EVERY - 1) == 0:
+                    self.update_stats(stats_snapshot())
+
+            # Итоговые значения, если последний файл не попал на границу пачки
+            stats = stats_snapshot()
+            self.update_stats(stats)
 
             # Итоговая статистика
             self.log_message("\n" + "-" * 80)
@@ -977,7 +1355,7 @@ class RenameMediaApp:
             self.log_message(f"   ⏩ Пропущено: {stats['skipped']}")
             self.log_message(f"   ❌ Ошибок: {stats['errors']}")
 
-            if self.dry_run.get():
+            if dry_run:
                 self.log_message("\n💡 Снимите галочку 'Тестовый режим' для реального переименования")
             elif changes_for_history:
                 # Записываем историю
@@ -985,19 +1363,19 @@ class RenameMediaApp:
                     self.history_manager.record(changes_for_history)
                     self.log_message(f"\n📝 Записано {len(changes_for_history)} операций в историю")
                     self.log_message("💡 Для отмены: меню Правка → Отменить (Ctrl+Z)")
-                    # Обновляем меню Undo (через after, так как это UI)
-                    self.root.after(0, self.update_undo_state)
+                    # Обновляем меню Undo (в главном потоке, так как это UI)
+                    self.run_in_ui(self.update_undo_state)
 
             # Показываем финальное сообщение
-            self.root.after(0, lambda: self.show_completion_message(stats))
+            self.run_in_ui(self.show_completion_message, stats)
 
         except Exception as e:
             self.log_message(f"\n❌ КРИТИЧЕСКАЯ ОШИБКА: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Ошибка", f"Произошла ошибка:\n{e}"))
+            self.run_in_ui(messagebox.showerror, "Ошибка", f"Произошла ошибка:\n{e}")
 
         finally:
             # Останавливаем прогресс и разблокируем кнопки
-            self.root.after(0, self.finish_processing)
+            self.run_in_ui(self.finish_processing)
 
     def show_completion_message(self, stats: dict):
         """Показать сообщение о завершении."""
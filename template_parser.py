@@ -7,9 +7,10 @@
 Дата: 2026-01-25
 """
 
+import functools
 import re
 from datetime import datetime
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Optional, Tuple
 
 
 class TemplateParser:
@@ -29,8 +30,25 @@ class TemplateParser:
         'HHmmss': lambda d, t: d.strftime('%H%M%S'),  # Время слитно
     }
     
+    # Директивы strftime для переменных даты: шаблон из одних таких
+    # переменных форматируется одним вызовом strftime вместо вызова на каждую
+    STRFTIME_DIRECTIVES: Dict[str, str] = {
+        'YYYY': '%Y',
+        'YY': '%y',
+        'MM': '%m',
+        'DD': '%d',
+        'HH': '%H',
+        'hh': '%I',
+        'mm': '%M',
+        'ss': '%S',
+        'HHmmss': '%H%M%S',
+    }
+
     # Шаблон по умолчанию (текущий формат)
     DEFAULT_TEMPLATE = "{type}-{YYYY}-{MM}-{DD}_{HHmmss}"
+
+    # Переменная шаблона: {имя}
+    VARIABLE_PATTERN = re.compile(r'\{(\w+)\}')
     
     def __init__(self, template: str = None):
         """
@@ -43,7 +61,14 @@ class TemplateParser:
             ValueError: если шаблон содержит неизвестные переменные
         """
         self.template = template or self.DEFAULT_TEMPLATE
-        self.validate()
+        # Шаблон по умолчанию заведомо корректен
+        if self.template != self.DEFAULT_TEMPLATE:
+            self.validate()
+        self._compile()
+        # Кэш результатов: у серий снимков и файлов, скопированных разом,
+        # одинаковые даты. Кэш создаётся на экземпляр, а не декоратором
+        # метода, чтобы self не попадал в ключ и парсер не удерживался кэшем
+        self._format_cached = functools.lru_cache(maxsize=4096)(self._format_impl)
     
     def validate(self) -> None:
         """
@@ -53,14 +78,10 @@ class TemplateParser:
             ValueError: если шаблон содержит неизвестные переменные
         """
         # Находим все переменные в шаблоне
-        pattern = r'\{(\w+)\}'
-        variables = re.findall(pattern, self.template)
+        variables = self.VARIABLE_PATTERN.findall(self.template)
         
-        # Проверяем каждую переменную
-        unknown_vars = []
-        for var in variables:
-            if var not in self.VARIABLES:
-                unknown_vars.append(var)
+        # Проверяем каждую переменную (порядок сохраняется для сообщения)
+        unknown_vars = [var for var in variables if var not in self.VARIABLES]
         
         if unknown_vars:
             raise ValueError(
@@ -68,6 +89,46 @@ class TemplateParser:
                 f"Доступные переменные: {', '.join(f'{{{v}}}' for v in self.VARIABLES.keys())}"
             )
     
+    def _compile(self) -> None:
+        """
+        Разобрать шаблон один раз: на куски текста и обработчики переменных.
+
+        Шаблон "{type}-{YYYY}" превращается в пары (текст перед переменной,
+        обработчик) (("", type), ("-", YYYY)) и хвост "": format() вызывает
+        только обработчики переменных, которые есть в шаблоне.
+
+        Если у всех переменных есть директивы strftime, дополнительно
+        строится строка формата "%Y-%m-..." (знаки % текста экранируются),
+        и format() обходится одним вызовом strftime.
+        """
+        tokens: List[Tuple[str, Callable[[datetime, str], str]]] = []
+        # Куски строки формата для strftime; None — место для {type}.
+        # Остаётся None, если в шаблоне есть переменная без директивы strftime
+        strftime_parts: Optional[List[Optional[str]]] = []
+
+        pos = 0
+        for match in self.VARIABLE_PATTERN.finditer(self.template):
+            literal = self.template[pos:match.start()]
+            var = match.group(1)
+            tokens.append((literal, self.VARIABLES[var]))
+            if strftime_parts is not None:
+                strftime_parts.append(literal.replace('%', '%%'))
+                if var == 'type':
+                    strftime_parts.append(None)
+                elif var in self.STRFTIME_DIRECTIVES:
+                    strftime_parts.append(self.STRFTIME_DIRECTIVES[var])
+                else:
+                    strftime_parts = None
+            pos = match.end()
+        self._tokens: Tuple[Tuple[str, Callable[[datetime, str], str]], ...] = tuple(tokens)
+        self._tail = self.template[pos:]
+        if strftime_parts is not None:
+            strftime_parts.append(self.template[pos:].replace('%', '%%'))
+
+        self._strftime_parts = strftime_parts
+        # Готовые строки формата по типу файла: {"Photo": "Photo-%Y-...", ...}
+        self._strftime_formats: Dict[str, str] = {}
+
     def format(self, date: datetime, file_type: str) -> str:
         """
         Сформировать имя файла по шаблону.
@@ -88,16 +149,29 @@ class TemplateParser:
             >>> parser.format(datetime(2023, 8, 15, 14, 22, 3), "Photo")
             'IMG_20230815_142203'
         """
-        result = self.template
-        
-        # Заменяем каждую переменную её значением
-        for var, func in self.VARIABLES.items():
-            placeholder = f"{{{var}}}"
-            if placeholder in result:
-                value = func(date, file_type)
-                result = result.replace(placeholder, value)
-        
-        return result
+        # Смещение часового пояса входит в ключ: даты с разными поясами,
+        # указывающие на один момент, равны, но их поля (час) различаются
+        return self._format_cached(date, date.utcoffset(), file_type)
+
+    def _format_impl(self, date: datetime, utcoffset, file_type: str) -> str:
+        """Сформировать имя файла по шаблону (без кэша, см. format)."""
+        if self._strftime_parts is not None:
+            fmt = self._strftime_formats.get(file_type)
+            if fmt is None:
+                type_part = file_type.replace('%', '%%')
+                fmt = self._strftime_formats[file_type] = "".join(
+                    type_part if part is None else part for part in self._strftime_parts
+                )
+            return date.strftime(fmt)
+
+        parts = []
+        append = parts.append
+        for literal, func in self._tokens:
+            append(literal)
+            append(func(date, file_type))
+        append(self._tail)
+
+        return "".join(parts)
     
     @classmethod
     def get_help_text(cls) -> str:
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты разбора дат из EXIF и ffprobe
+"""
+
+import os
+import struct
+from datetime import datetime
+
+from PIL import Image
+
+from rename_media_cli import (
+    DATE_FORMAT, _fast_exif_dt, _jpeg_exif_dt, _parse_creation_time, _quicktime_creation_dt, fmt_dt,
+    get_file_creation_date
+)
+
+
+def test_fast_exif_dt():
+    """Быстрый разбор поддерживает форматы EXIF и ffprobe"""
+    expected = datetime(2023, 8, 15, 14, 22, 3)
+
+    assert _fast_exif_dt("2023:08:15 14:22:03") == expected
+    assert _fast_exif_dt("2023-08-15 14:22:03") == expected
+    assert _fast_exif_dt("2023-08-15T14:22:03") == expected
+    assert _fast_exif_dt("2023:08:15 14:22:03\x00") == expected
+
+
+def test_fast_exif_dt_invalid():
+    """Некорректные значения возвращают None вместо исключения"""
+    assert _fast_exif_dt("0000:00:00 00:00:00") is None
+    assert _fast_exif_dt("2023:08:15") is None
+    assert _fast_exif_dt("") is None
+    assert _fast_exif_dt(None) is None
+
+
+def test_parse_creation_time():
+    """Значения creation_time из ffprobe"""
+    expected = datetime(2023, 8, 15, 14, 22, 3)
+
+    assert _parse_creation_time("2023-08-15T14:22:03.000000Z") == expected
+    assert _parse_creation_time("2023-08-15 14:22:03") == expected
+    assert _parse_creation_time("not a date") is None
+
+
+def test_jpeg_exif_dt(tmp_path):
+    """Прямой разбор APP1 соблюдает приоритет тегов EXIF"""
+    image = Image.new("RGB", (8, 8))
+
+    exif = Image.Exif()
+    exif[0x0132] = "2020:01:02 03:04:05"                 # DateTime
+    exif.get_ifd(0x8769)[0x9003] = "2019:05:06 07:08:09"  # DateTimeOriginal
+    photo = tmp_path / "photo.jpg"
+    image.save(photo, exif=exif)
+    assert _jpeg_exif_dt(str(photo)) == datetime(2019, 5, 6, 7, 8, 9)
+
+    exif = Image.Exif()
+    exif[0x0132] = "2020:01:02 03:04:05"
+    photo_datetime = tmp_path / "datetime.jpg"
+    image.save(photo_datetime, exif=exif)
+    assert _jpeg_exif_dt(str(photo_datetime)) == datetime(2020, 1, 2, 3, 4, 5)
+
+    no_exif = tmp_path / "no_exif.jpg"
+    image.save(no_exif)
+    assert _jpeg_exif_dt(str(no_exif)) is None
+
+
+def test_file_creation_date_uses_given_stat(tmp_path):
+    """Готовый stat используется без повторного обращения к файлу"""
+    file_path = tmp_path / "clip.mov"
+    file_path.write_bytes(b"")
+    stat = os.stat(file_path)
+    file_path.unlink()
+
+    result = get_file_creation_date(str(file_path), stat)
+    assert result <= datetime.fromtimestamp(stat.st_mtime)
+
+
+def test_fmt_dt_matches_date_format():
+    """fmt_dt даёт ту же строку, что и strftime(DATE_FORMAT)"""
+    for date in (datetime(2023, 8, 15, 14, 22, 3), datetime(2001, 1, 2, 0, 0, 9)):
+        assert fmt_dt(date) == date.strftime(DATE_FORMAT)
+
+
+def _atom(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack('>I4s', 8 + len(payload), kind) + payload
+
+
+def test_quicktime_creation_dt(tmp_path):
+    """Дата из moov/mvhd читается и при moov после данных (mdat)"""
+    expected = datetime(2023, 8, 15, 14, 22, 3)
+    seconds = int((expected - datetime(1970, 1, 1)).total_seconds()) + 2082844800
+
+    mvhd_v0 = _atom(b'mvhd', b'\x00\x00\x00\x00' + struct.pack('>II', seconds, seconds) + bytes(88))
+    mvhd_v1 = _atom(b'mvhd', b'\x01\x00\x00\x00' + struct.pack('>QQ', seconds, seconds) + bytes(96))
+
+    for name, mvhd in (("v0.mp4", mvhd_v0), ("v1.mov", mvhd_v1)):
+        video = tmp_path / name
+        video.write_bytes(_atom(b'ftyp', b'isom' + bytes(4)) + _atom(b'mdat', bytes(1000))
+                          + _atom(b'moov', mvhd))
+        assert _quicktime_creation_dt(str(video)) == expected
+
+    # Нулевая дата и файл без moov
+    empty = tmp_path / "empty.mp4"
+    empty.write_bytes(_atom(b'moov', _atom(b'mvhd', bytes(100))))
+    assert _quicktime_creation_dt(str(empty)) is None
+    (tmp_path / "bad.mp4").write_bytes(b"not a video")
+    assert _quicktime_creation_dt(str(tmp_path / "bad.mp4")) is None
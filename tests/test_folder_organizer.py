@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты организатора папок
+"""
+
+from datetime import datetime
+from pathlib import Path
+
+from folder_organizer import FolderOrganizer
+
+
+def test_get_folder_path():
+    """Путь папки для каждого режима группировки"""
+    base_dir = Path("photos")
+    date = datetime(2023, 8, 5, 14, 22, 3)
+
+    assert FolderOrganizer('none').get_folder_path(base_dir, date) == base_dir
+    assert FolderOrganizer('year').get_folder_path(base_dir, date) == base_dir / "2023"
+    assert FolderOrganizer('year-month').get_folder_path(base_dir, date) == base_dir / "2023" / "08"
+    assert FolderOrganizer('date').get_folder_path(base_dir, date) == base_dir / "2023-08-05"
+
+
+def test_get_folder_path_cached_per_day():
+    """Кэш по дню не смешивает разные базовые папки и даты"""
+    organizer = FolderOrganizer('year-month')
+    date = datetime(2023, 8, 5, 10, 0, 0)
+
+    assert organizer.get_folder_path(Path("a"), date) == Path("a") / "2023" / "08"
+    assert organizer.get_folder_path(Path("b"), date) == Path("b") / "2023" / "08"
+    assert organizer.get_folder_path(Path("a"), datetime(2024, 1, 1)) == Path("a") / "2024" / "01"
+
+
+def test_create_folder_once(tmp_path):
+    """Папка создаётся один раз, повторные вызовы не обращаются к диску"""
+    organizer = FolderOrganizer('year-month')
+    folder = tmp_path / "2023" / "08"
+
+    assert organizer.create_folder(folder, dry_run=True)
+    assert not folder.exists()
+
+    assert organizer.create_folder(folder)
+    assert folder.is_dir()
+    assert not organizer.create_folder(folder)
+
+    existing = tmp_path / "2024"
+    existing.mkdir()
+    assert not FolderOrganizer('year').create_folder(existing)
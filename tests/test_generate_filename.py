@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты генерации новых имён файлов
+"""
+
+import os
+from datetime import datetime
+
+from folder_organizer import FolderOrganizer
+from history_manager import HistoryManager
+from rename_media_cli import (
+    STATUS_ERR, STATUS_SKIP, generate_new_filename, get_renamed_name_date, is_already_renamed,
+    process_file, scan_and_rename
+)
+from template_parser import TemplateParser
+
+
+def test_name_cache_matches_exists_check(tmp_path):
+    """Кэш имён даёт те же суффиксы, что и проверка через exists()"""
+    date = datetime(2023, 8, 15, 14, 22, 3)
+    (tmp_path / "Photo-2023-08-15_142203.jpg").write_text("1")
+    (tmp_path / "Photo-2023-08-15_142203_1.jpg").write_text("2")
+
+    expected, _ = generate_new_filename("Photo", date, ".jpg", str(tmp_path))
+
+    name_cache = {}
+    name, target_dir = generate_new_filename("Photo", date, ".jpg", str(tmp_path),
+                                             name_cache=name_cache)
+    assert name == expected == "Photo-2023-08-15_142203_2.jpg"
+    assert target_dir == str(tmp_path)
+
+    # Выбранное имя зарезервировано, хотя файл ещё не создан
+    name, _ = generate_new_filename("Photo", date, ".jpg", str(tmp_path),
+                                    name_cache=name_cache)
+    assert name == "Photo-2023-08-15_142203_3.jpg"
+
+
+def test_name_cache_with_template_subfolders(tmp_path):
+    """Имена с подпапками из шаблона сверяются с содержимым этих подпапок"""
+    date = datetime(2023, 8, 15, 14, 22, 3)
+    (tmp_path / "2023").mkdir()
+    (tmp_path / "2023" / "Photo_20230815.jpg").write_text("1")
+    parser = TemplateParser("{YYYY}/{type}_{YYYY}{MM}{DD}")
+
+    name, _ = generate_new_filename("Photo", date, ".jpg", str(tmp_path), parser,
+                                    name_cache={})
+    assert name == "2023/Photo_20230815_1.jpg"
+
+
+def test_process_file_keeps_renamed_name(tmp_path):
+    """Уже переименованный файл с той же датой не получает суффикс _1"""
+    date = datetime(2023, 8, 15, 14, 22, 3)
+    photo = tmp_path / "Photo-2023-08-15_142203_1.jpg"
+    photo.write_text("1")
+
+    assert is_already_renamed(photo.name) == (True, "Photo")
+    assert get_renamed_name_date(photo.name) == date
+
+    status, _, paths = process_file(str(photo), media_date=(date, "EXIF"), name_cache={})
+    assert status == STATUS_SKIP
+    assert paths is None
+    assert photo.exists()
+
+
+def test_unreadable_target_folder_is_a_file_error(tmp_path):
+    """Файл на месте папки группировки — ошибка этого файла, а не исключение"""
+    (tmp_path / "2023").write_text("не папка")
+    photo = tmp_path / "IMG_0001.jpg"
+    photo.write_text("1")
+    date = datetime(2023, 8, 15, 14, 22, 3)
+
+    status, _, paths = process_file(str(photo), media_date=(date, "EXIF"), name_cache={},
+                                    folder_organizer=FolderOrganizer('year'))
+    assert status == STATUS_ERR
+    assert paths is None
+    assert photo.exists()
+
+
+def test_scan_continues_after_file_error(tmp_path, monkeypatch):
+    """Ошибка одного файла не прерывает обработку и не теряет историю"""
+    first = tmp_path / "IMG_0001.jpg"
+    second = tmp_path / "IMG_0002.jpg"
+    first.write_text("1")
+    second.write_text("2")
+    os.utime(first, (1692109323, 1692109323))   # 2023
+    os.utime(second, (1704878130, 1704878130))  # 2024
+
+    def create_folder(self, folder_path, dry_run=False):
+        if folder_path.name == "2023":
+            raise PermissionError("нет доступа")
+        folder_path.mkdir(exist_ok=True)
+        return True
+
+    monkeypatch.setattr(FolderOrganizer, "create_folder", create_folder)
+    stats = scan_and_rename(str(tmp_path), organize='year', has_ffprobe=False)
+
+    assert (stats['total'], stats['success'], stats['errors']) == (2, 1, 1)
+    assert first.exists()
+    assert len(HistoryManager(tmp_path).get_history()) == 1
+
+
+def test_dry_run_writes_nothing(tmp_path):
+    """Тестовый режим не переименовывает файлы и не создаёт кэш дат"""
+    photo = tmp_path / "IMG_0001.jpg"
+    photo.write_text("1")
+
+    stats = scan_and_rename(str(tmp_path), dry_run=True, has_ffprobe=False)
+
+    assert stats['success'] == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["IMG_0001.jpg"]
+
+
+def test_renamed_name_date():
+    """Дата из имени переименованного файла; несуществующая дата — None"""
+    assert get_renamed_name_date("video-2024-01-10_091530_2.mp4") == datetime(2024, 1, 10, 9, 15, 30)
+    assert get_renamed_name_date("Photo-2023-13-15_142203.jpg") is None
+    assert get_renamed_name_date("IMG_20230815.jpg") is None
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты менеджера истории (Undo)
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from history_manager import HistoryManager, rename_noreplace
+
+
+def test_undo_restores_files_and_removes_empty_folders(tmp_path):
+    """Откат возвращает файлы и удаляет опустевшие папки группировки"""
+    (tmp_path / "2023" / "08").mkdir(parents=True)
+    (tmp_path / "2023" / "08" / "Photo-2023-08-15_142203.jpg").write_text("1")
+    (tmp_path / "Photo-2024-01-10_091530.jpg").write_text("2")
+
+    manager = HistoryManager(tmp_path)
+    manager.record([
+        {"old": "IMG_0001.jpg", "new": str(Path("2023") / "08" / "Photo-2023-08-15_142203.jpg")},
+        {"old": "IMG_0002.jpg", "new": "Photo-2024-01-10_091530.jpg"},
+    ])
+
+    success, success_msgs, error_msgs = manager.undo()
+
+    assert success
+    assert len(success_msgs) == 2
+    assert error_msgs == []
+    assert (tmp_path / "IMG_0001.jpg").read_text() == "1"
+    assert (tmp_path / "IMG_0002.jpg").read_text() == "2"
+    assert not (tmp_path / "2023").exists()
+    assert manager.get_history() == []
+
+
+def test_undo_reports_conflicts_and_missing_files(tmp_path):
+    """Существующий целевой файл не перезаписывается, пропавший файл — ошибка"""
+    (tmp_path / "Photo-2023-08-15_142203.jpg").write_text("renamed")
+    (tmp_path / "IMG_0001.jpg").write_text("other")
+
+    manager = HistoryManager(tmp_path)
+    manager.record([
+        {"old": "IMG_0001.jpg", "new": "Photo-2023-08-15_142203.jpg"},
+        {"old": "IMG_0002.jpg", "new": "Photo-2024-01-10_091530.jpg"},
+    ])
+
+    success, success_msgs, error_msgs = manager.undo()
+
+    assert not success
+    assert success_msgs == []
+    assert len(error_msgs) == 2
+    assert (tmp_path / "IMG_0001.jpg").read_text() == "other"
+    assert (tmp_path / "Photo-2023-08-15_142203.jpg").read_text() == "renamed"
+
+
+def test_journal_replay_keeps_limit_and_undo(tmp_path):
+    """Журнал воспроизводится с тем же лимитом и учётом отмен"""
+    manager = HistoryManager(tmp_path)
+    for i in range(HistoryManager.MAX_HISTORY_SIZE + 2):
+        manager.record([{"old": f"old_{i}.jpg", "new": f"new_{i}.jpg"}])
+    manager.undo()
+
+    reloaded = HistoryManager(tmp_path)
+    assert reloaded.get_history() == manager.get_history()
+    assert len(reloaded.get_history()) == HistoryManager.MAX_HISTORY_SIZE - 1
+    assert reloaded.get_history()[0]["files"][0]["old"] == "old_10.jpg"
+
+
+def test_legacy_history_is_migrated(tmp_path):
+    """История в прежнем формате читается и переносится в журнал"""
+    legacy = [{"timestamp": "2026-01-27T10:00:00", "operation": "rename",
+               "files": [{"old": "a.jpg", "new": "b.jpg"}]}]
+    (tmp_path / HistoryManager.LEGACY_HISTORY_FILENAME).write_text(
+        json.dumps(legacy), encoding="utf-8")
+
+    manager = HistoryManager(tmp_path)
+    assert manager.get_history() == legacy
+
+    manager.record([{"old": "c.jpg", "new": "d.jpg"}])
+    assert not (tmp_path / HistoryManager.LEGACY_HISTORY_FILENAME).exists()
+
+    history = HistoryManager(tmp_path).get_history()
+    assert [entry["files"][0]["old"] for entry in history] == ["c.jpg", "a.jpg"]
+
+
+@pytest.mark.skipif(sys.platform == 'darwin', reason="os.rename в macOS заменяет файл назначения")
+def test_rename_noreplace_keeps_existing_target(tmp_path):
+    """Переименование не затирает файл, занявший исходное имя"""
+    (tmp_path / "renamed.jpg").write_text("renamed")
+    (tmp_path / "IMG_0001.jpg").write_text("other")
+
+    with pytest.raises(FileExistsError):
+        rename_noreplace(tmp_path / "renamed.jpg", tmp_path / "IMG_0001.jpg")
+
+    assert (tmp_path / "IMG_0001.jpg").read_text() == "other"
+    assert (tmp_path / "renamed.jpg").read_text() == "renamed"
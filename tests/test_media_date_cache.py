@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты кэша дат медиафайлов
+"""
+
+import json
+import os
+from datetime import datetime
+
+from media_date_cache import MediaDateCache
+
+
+def test_cache_roundtrip(tmp_path):
+    """Сохранённая дата читается новым экземпляром, пока файл не изменился"""
+    photo = tmp_path / "IMG_0001.jpg"
+    photo.write_bytes(b"data")
+    date = datetime(2023, 8, 15, 14, 22, 3)
+
+    cache = MediaDateCache(tmp_path)
+    cache.put(str(photo), os.stat(photo), date, "EXIF")
+    cache.save()
+
+    cache = MediaDateCache(tmp_path)
+    assert cache.get(str(photo), os.stat(photo)) == (date, "EXIF")
+
+    # Изменение размера делает запись недействительной
+    photo.write_bytes(b"changed data")
+    assert cache.get(str(photo), os.stat(photo)) is None
+
+
+def test_cache_drops_unseen_files(tmp_path):
+    """Записи файлов, не встреченных в запуске, не сохраняются"""
+    first = tmp_path / "a.jpg"
+    second = tmp_path / "b.jpg"
+    first.write_bytes(b"a")
+    second.write_bytes(b"b")
+    date = datetime(2023, 8, 15, 14, 22, 3)
+
+    cache = MediaDateCache(tmp_path)
+    cache.put(str(first), os.stat(first), date, "EXIF")
+    cache.put(str(second), os.stat(second), date, "EXIF")
+    cache.save()
+
+    cache = MediaDateCache(tmp_path)
+    assert cache.get(str(first), os.stat(first)) == (date, "EXIF")
+    cache.save()
+
+    cache = MediaDateCache(tmp_path)
+    assert cache.get(str(second), os.stat(second)) is None
+
+
+def test_cache_follows_renamed_file(tmp_path):
+    """После переименования дата находится по новому имени"""
+    photo = tmp_path / "IMG_0001.jpg"
+    photo.write_bytes(b"data")
+    date = datetime(2023, 8, 15, 14, 22, 3)
+
+    cache = MediaDateCache(tmp_path)
+    cache.put(str(photo), os.stat(photo), date, "EXIF")
+    renamed = tmp_path / "Photo-2023-08-15_142203.jpg"
+    os.rename(photo, renamed)
+    cache.move(str(photo), str(renamed))
+    cache.save()
+
+    cache = MediaDateCache(tmp_path)
+    assert cache.get(str(renamed), os.stat(renamed)) == (date, "EXIF")
+
+
+def test_cache_ignores_damaged_entries(tmp_path):
+    """Повреждённые записи в файле кэша — промах, а не исключение"""
+    photo = tmp_path / "IMG_0001.jpg"
+    photo.write_bytes(b"data")
+    stat = os.stat(photo)
+    date = datetime(2023, 8, 15, 14, 22, 3)
+
+    for entry in (5, [stat.st_mtime_ns], [stat.st_mtime_ns, stat.st_size, date.isoformat()],
+                  [stat.st_mtime_ns, stat.st_size, 7, "EXIF"]):
+        (tmp_path / MediaDateCache.CACHE_FILENAME).write_text(json.dumps(
+            {"version": MediaDateCache.VERSION, "files": {"IMG_0001.jpg": entry}}
+        ))
+        cache = MediaDateCache(tmp_path)
+        assert cache.get(str(photo), stat) is None
@@ -5,58 +5,59 @@
 """
 
 import sys
-from pathlib import Path
 
-# Добавляем текущую директорию в путь
-sys.path.insert(0, str(Path(__file__).parent))
+import pytest
 
 from rename_media_gui import is_already_renamed, RENAMED_PATTERN
 
-def test_is_already_renamed():
+TEST_CASES = [
+    ("Photo-2023-08-15_142203.jpg", True, "Photo"),
+    ("Video-2024-01-10_091530.mp4", True, "Video"),
+    ("Photo-2023-08-15_142203_1.jpg", True, "Photo"),
+    ("Photo-2023-08-15_142203_99.png", True, "Photo"),
+    ("video-2020-01-01_000000.avi", True, "video"),  # case insensitive
+    ("IMG_20230815.jpg", False, ""),
+    ("VID_20240110.mp4", False, ""),
+    ("my_photo.jpg", False, ""),
+    ("Photo-2023-08-15.jpg", False, ""),  # нет времени
+    ("Photo-23-08-15_142203.jpg", False, ""),  # неправильный год
+]
+
+# Ожидаемые результаты собираются один раз при импорте модуля
+FILENAMES = [filename for filename, _, _ in TEST_CASES]
+EXPECTED = [(match, prefix) for _, match, prefix in TEST_CASES]
+
+
+@pytest.mark.parametrize("filename,expected", list(zip(FILENAMES, EXPECTED)), ids=FILENAMES)
+def test_is_already_renamed(filename, expected):
     """Тестирование функции is_already_renamed()"""
-    
-    test_cases = [
-        ("Photo-2023-08-15_142203.jpg", True, "Photo"),
-        ("Video-2024-01-10_091530.mp4", True, "Video"),
-        ("Photo-2023-08-15_142203_1.jpg", True, "Photo"),
-        ("Photo-2023-08-15_142203_99.png", True, "Photo"),
-        ("video-2020-01-01_000000.avi", True, "video"),  # case insensitive
-        ("IMG_20230815.jpg", False, ""),
-        ("VID_20240110.mp4", False, ""),
-        ("my_photo.jpg", False, ""),
-        ("Photo-2023-08-15.jpg", False, ""),  # нет времени
-        ("Photo-23-08-15_142203.jpg", False, ""),  # неправильный год
-    ]
-    
-    print("=" * 70)
-    print("Тестирование функции is_already_renamed()")
-    print("=" * 70)
-    print()
-    
-    passed = 0
-    failed = 0
-    
-    for filename, expected_match, expected_prefix in test_cases:
-        is_match, prefix = is_already_renamed(filename)
-        
-        if is_match == expected_match and prefix == expected_prefix:
-            status = "✅ PASS"
-            passed += 1
-        else:
-            status = "❌ FAIL"
-            failed += 1
-        
-        print(f"{status} | {filename:40} | Match: {is_match:5} | Prefix: '{prefix}'")
-        if is_match != expected_match or prefix != expected_prefix:
-            print(f"       Expected: Match: {expected_match:5} | Prefix: '{expected_prefix}'")
-    
-    print()
-    print("=" * 70)
-    print(f"Результаты: {passed} пройдено, {failed} провалено")
-    print("=" * 70)
-    
-    return failed == 0
+    assert is_already_renamed(filename) == expected
+
+
+@pytest.mark.parametrize("filename,expected", list(zip(FILENAMES, EXPECTED)), ids=FILENAMES)
+def test_renamed_pattern_matches_cases(filename, expected):
+    """Регулярное выражение RENAMED_PATTERN согласовано с ожидаемыми префиксами"""
+    match = RENAMED_PATTERN.fullmatch(filename)
+    assert (match is not None, match.group(1) if match else "") == expected
+
+
+# Длинные почти подходящие имена: на выражениях с вложенными квантификаторами
+# такие строки вызывают катастрофический возврат (backtracking)
+ADVERSARIAL_NAMES = [
+    "Photo" + "-" * 100 + ".jpg",
+    "Photo-" + "1" * 100000 + ".jpg",
+    "Photo-2023-08-15_142203_" + "1" * 100000,
+    "Photo-2023-08-15_142203" + "_1" * 50000 + ".jpg",
+    "Photo-2023-08-15_142203." + "a" * 100000 + "!",
+]
+
+
+@pytest.mark.parametrize("filename", ADVERSARIAL_NAMES, ids=lambda name: name[:30])
+def test_adversarial_names_are_rejected(filename):
+    """Проверка отвергает длинные почти подходящие имена"""
+    assert is_already_renamed(filename) == (False, "")
+    assert RENAMED_PATTERN.fullmatch(filename) is None
+
 
 if __name__ == "__main__":
-    success = test_is_already_renamed()
-    sys.exit(0 if success else 1)
+    sys.exit(pytest.main([__file__, "-v"]))
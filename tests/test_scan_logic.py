@@ -1,75 +1,87 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-Тестовый скрипт для проверки логики сканирования файлов
+Тесты логики сканирования файлов
 """
 
 import sys
 from pathlib import Path
 
-# Добавляем текущую директорию в путь
-sys.path.insert(0, str(Path(__file__).parent))
-
-from rename_media_gui import is_already_renamed, PHOTO_EXTENSIONS, VIDEO_EXTENSIONS
-
-def test_scan_logic():
-    """Тестирование логики сканирования файлов"""
-    
-    print("=" * 70)
-    print("Тестирование логики сканирования файлов в папке Files/")
-    print("=" * 70)
-    print()
-    
-    root = Path("Files")
-    supported_exts = PHOTO_EXTENSIONS | VIDEO_EXTENSIONS
-    
-    # Собираем все файлы
-    all_files = [
-        f for f in root.rglob('*')
-        if f.is_file() and f.suffix.lower() in supported_exts
-    ]
-    
-    already_renamed = []
-    to_rename = []
-    
-    for file_path in all_files:
-        is_renamed, prefix = is_already_renamed(file_path.name)
+import pytest
+
+from rename_media_gui import is_already_renamed, _iter_media, EXT_TO_ICON, SUPPORTED_EXTENSIONS
+
+# Сколько примеров каждого вида запоминается при сканировании
+SAMPLE_LIMIT = 10
+
+
+def scan(root):
+    """
+    Один проход без списка всех файлов: счётчики и до SAMPLE_LIMIT примеров.
+
+    Returns:
+        (всего, уже_переименовано, к_переименованию,
+         примеры_переименованных [(имя, префикс)], примеры_к_переименованию [имя])
+    """
+    total = 0
+    renamed_count = 0
+    to_rename_count = 0
+    sample_renamed = []
+    sample_to_rename = []
+
+    for path in _iter_media(str(root), SUPPORTED_EXTENSIONS):
+        total += 1
+        name = Path(path).name
+        is_renamed, prefix = is_already_renamed(name)
         if is_renamed:
-            already_renamed.append(file_path)
+            renamed_count += 1
+            if len(sample_renamed) < SAMPLE_LIMIT:
+                sample_renamed.append((name, prefix))
         else:
-            to_rename.append(file_path)
-    
-    print(f"📊 Всего файлов: {len(all_files)}")
-    print(f"   • Уже переименованных: {len(already_renamed)}")
-    print(f"   • Требуют переименования: {len(to_rename)}")
-    print()
-    
-    if already_renamed:
-        print("✅ Уже переименованные файлы:")
-        for file_path in already_renamed[:10]:  # Показываем первые 10
-            is_renamed, prefix = is_already_renamed(file_path.name)
-            icon = "📷" if prefix.lower() == "photo" else "🎬"
-            print(f"   {icon} {file_path.name}")
-        if len(already_renamed) > 10:
-            print(f"   ... и ещё {len(already_renamed) - 10} файлов")
-        print()
-    
-    if to_rename:
-        print("📝 Требуют переименования (примеры):")
-        for file_path in to_rename[:10]:  # Показываем первые 10
-            ext = file_path.suffix.lower()
-            icon = "📷" if ext in PHOTO_EXTENSIONS else "🎬"
-            print(f"   {icon} {file_path.name}")
-        if len(to_rename) > 10:
-            print(f"   ... и ещё {len(to_rename) - 10} файлов")
-        print()
-    
-    print("=" * 70)
-    print("✅ Тест завершён успешно!")
-    print("=" * 70)
-    
-    return True
+            to_rename_count += 1
+            if len(sample_to_rename) < SAMPLE_LIMIT:
+                sample_to_rename.append(name)
+
+    return total, renamed_count, to_rename_count, sample_renamed, sample_to_rename
+
+
+def test_scan_logic(tmp_path):
+    """Сканирование делит медиафайлы на переименованные и требующие переименования"""
+    (tmp_path / "Photo-2023-08-15_142203.jpg").write_text("1")
+    (tmp_path / "Video-2024-01-10_091530_1.mp4").write_text("2")
+    (tmp_path / "IMG_0001.JPG").write_text("3")
+    (tmp_path / "notes.txt").write_text("не медиафайл")
+    (tmp_path / ".jpg").write_text("скрытый файл без расширения")
+
+    sub = tmp_path / "2020"
+    sub.mkdir()
+    (sub / "photo-2020-01-01_000000.png").write_text("4")
+    (sub / "VID_0002.mov").write_text("5")
+    (sub / "readme.md").write_text("не медиафайл")
+
+    total, renamed_count, to_rename_count, sample_renamed, sample_to_rename = scan(tmp_path)
+
+    assert (total, renamed_count, to_rename_count) == (5, 3, 2)
+    assert sorted(sample_renamed) == [
+        ("Photo-2023-08-15_142203.jpg", "Photo"),
+        ("Video-2024-01-10_091530_1.mp4", "Video"),
+        ("photo-2020-01-01_000000.png", "photo"),
+    ]
+    assert sorted(sample_to_rename) == ["IMG_0001.JPG", "VID_0002.mov"]
+    assert [EXT_TO_ICON[Path(name).suffix.lower()] for name in sorted(sample_to_rename)] == ["📷", "🎬"]
+
+
+def test_scan_logic_limits_samples(tmp_path):
+    """Счётчики учитывают все файлы, примеров запоминается не больше SAMPLE_LIMIT"""
+    for i in range(SAMPLE_LIMIT + 5):
+        (tmp_path / f"IMG_{i:04}.jpg").write_text(str(i))
+
+    total, renamed_count, to_rename_count, sample_renamed, sample_to_rename = scan(tmp_path)
+
+    assert (total, renamed_count, to_rename_count) == (SAMPLE_LIMIT + 5, 0, SAMPLE_LIMIT + 5)
+    assert sample_renamed == []
+    assert len(sample_to_rename) == SAMPLE_LIMIT
+
 
 if __name__ == "__main__":
-    success = test_scan_logic()
-    sys.exit(0 if success else 1)
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Тесты парсера шаблонов имён
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from template_parser import TemplateParser
+
+
+def test_format_templates():
+    """Каждая переменная шаблона заменяется своим значением"""
+    date = datetime(2023, 8, 5, 14, 2, 3)
+
+    assert TemplateParser().format(date, "Photo") == "Photo-2023-08-05_140203"
+    assert TemplateParser("{type}_{DD}.{MM}.{YY}_{hh}-{mm}-{ss}").format(date, "Video") == \
+        "Video_05.08.23_02-02-03"
+    assert TemplateParser("{YYYY}/{MM}/{type}_{YYYY}{MM}{DD}").format(date, "Photo") == \
+        "2023/08/Photo_20230805"
+    # Текст вне переменных, повторы и пустые куски между переменными
+    assert TemplateParser("{HH}{HH}%{type}{}").format(date, "Photo") == "1414%Photo{}"
+    assert TemplateParser("static").format(date, "Photo") == "static"
+
+
+def test_unknown_variable():
+    """Неизвестная переменная отклоняется при создании парсера"""
+    with pytest.raises(ValueError):
+        TemplateParser("{type}-{INVALID}")
+
+
+def test_strftime_directives_match_variables():
+    """Строка формата strftime даёт те же значения, что и обработчики переменных"""
+    date = datetime(2023, 8, 5, 21, 2, 3)
+
+    for var, func in TemplateParser.VARIABLES.items():
+        assert TemplateParser(f"{{{var}}}").format(date, "Photo") == func(date, "Photo")
+
+
+def test_format_cache_keeps_timezones_apart():
+    """Один момент в разных часовых поясах не берётся из кэша по ошибке"""
+    parser = TemplateParser("{HH}")
+    utc = datetime(2023, 8, 5, 12, 0, 0, tzinfo=timezone.utc)
+    local = utc.astimezone(timezone(timedelta(hours=3)))
+
+    assert parser.format(utc, "Photo") == "12"
+    assert parser.format(local, "Photo") == "15"
+
+
+def test_format_variable_without_directive():
+    """Переменная без директивы strftime форматируется своим обработчиком"""
+
+    class CounterParser(TemplateParser):
+        VARIABLES = dict(TemplateParser.VARIABLES, N=lambda d, t: "7")
+
+    date = datetime(2023, 8, 5, 14, 2, 3)
+    assert CounterParser("{type}-{YYYY}_{N}%").format(date, "Photo") == "Photo-2023_7%"